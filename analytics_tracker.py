@@ -3,15 +3,223 @@
 Analytics and Performance Tracking System
 """
 
-import sqlite3
+import aiosqlite
 import asyncio
+import time
+import numpy as np
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Timestamps are Unix seconds; sale_day (YYYYMMDD) and sale_month (YYYYMM) are the
+# local calendar buckets, written alongside sale_date so reports never call strftime
+_SALES_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS sales (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_id TEXT,
+        amount INTEGER,
+        customer_email TEXT,
+        sale_date INTEGER,
+        platform TEXT,
+        sale_day INTEGER,
+        sale_month INTEGER,
+        FOREIGN KEY (product_id) REFERENCES products (id)
+    )
+"""
+
+# Hot-path statements live at module level so every call hands sqlite3 the identical
+# string and reuses its compiled statement from the connection's statement cache
+_SQL_INSERT_PRODUCT = """
+    INSERT INTO products 
+    (id, title, niche, quality_score, price, created_at, whop_product_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO NOTHING
+"""
+
+# Ids per existence check, below SQLite's default host-parameter limit
+_ID_LOOKUP_CHUNK = 500
+
+_SQL_INSERT_SALE = """
+    INSERT INTO sales (product_id, amount, customer_email, sale_date, platform, sale_day, sale_month)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_ROLLUP_PRODUCTS = """
+    INSERT INTO daily_summary 
+    (date, products_created, total_revenue, total_sales, avg_quality_score)
+    VALUES (?, ?, 0, 0, ?)
+    ON CONFLICT(date) DO UPDATE SET
+        avg_quality_score = (
+            COALESCE(avg_quality_score, 0) * COALESCE(products_created, 0)
+            + excluded.avg_quality_score * excluded.products_created
+        ) / (COALESCE(products_created, 0) + excluded.products_created),
+        products_created = COALESCE(products_created, 0) + excluded.products_created
+"""
+
+_SQL_ROLLUP_SALES = """
+    INSERT INTO daily_summary 
+    (date, products_created, total_revenue, total_sales, avg_quality_score)
+    VALUES (?, 0, ?, ?, 0)
+    ON CONFLICT(date) DO UPDATE SET
+        total_revenue = COALESCE(total_revenue, 0) + excluded.total_revenue,
+        total_sales = COALESCE(total_sales, 0) + excluded.total_sales
+"""
+
+_SQL_WATERMARK = """
+    SELECT (SELECT COALESCE(MAX(rowid), 0) FROM products),
+           (SELECT COALESCE(MAX(rowid), 0) FROM sales)
+"""
+
+_SQL_DAILY_PRODUCTS = """
+    SELECT COUNT(*), COALESCE(AVG(quality_score), 0)
+    FROM products WHERE created_at >= ? AND created_at < ?
+"""
+
+_SQL_DAILY_SALES = """
+    SELECT COUNT(*), COALESCE(SUM(amount), 0)
+    FROM sales WHERE sale_day = ?
+"""
+
+_SQL_DAILY_TOP_NICHE = """
+    SELECT niche FROM products
+    WHERE created_at >= ? AND created_at < ?
+    GROUP BY niche ORDER BY COUNT(*) DESC LIMIT 1
+"""
+
+_SQL_STORE_DAILY_SUMMARY = """
+    INSERT OR REPLACE INTO daily_summary 
+    (date, products_created, total_revenue, total_sales, avg_quality_score, top_niche)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_WEEKLY_REPORT = """
+    WITH totals AS (
+        SELECT 
+            COALESCE(SUM(products_created), 0) as products,
+            COALESCE(SUM(total_revenue), 0) as revenue,
+            COALESCE(SUM(total_sales), 0) as sales,
+            COALESCE(
+                SUM(avg_quality_score * products_created) / NULLIF(SUM(products_created), 0), 0
+            ) as avg_quality
+        FROM daily_summary
+        WHERE date >= :week_ago
+    )
+    SELECT json_object(
+        'period', '7_days',
+        'total_products', products,
+        'total_revenue', revenue / 100.0,
+        'total_sales', sales,
+        'avg_quality_score', round(avg_quality, 2),
+        'conversion_rate', sales * 100.0 / MAX(products, 1),
+        'top_niches', json((
+            SELECT json_group_array(json_object(
+                'niche', niche, 'count', count, 'avg_quality', round(avg_quality, 2)
+            ))
+            FROM (
+                SELECT niche, COUNT(*) as count, COALESCE(AVG(quality_score), 0) as avg_quality
+                FROM products WHERE created_at >= :week_start
+                GROUP BY niche ORDER BY count DESC LIMIT 5
+            )
+        )),
+        'daily_trends', json((
+            SELECT json_group_array(json_object(
+                'date', date, 'products', products_created,
+                'quality', round(COALESCE(avg_quality_score, 0), 2)
+            ))
+            FROM (
+                SELECT date, products_created, avg_quality_score
+                FROM daily_summary WHERE date >= :week_ago AND products_created > 0
+                ORDER BY date
+            )
+        ))
+    )
+    FROM totals
+"""
+
+_SQL_REVENUE_TOTALS = """
+    SELECT 
+        p.total_products,
+        s.total_revenue,
+        s.total_sales,
+        p.avg_quality
+    FROM (
+        SELECT COUNT(*) as total_products,
+               COALESCE(AVG(quality_score), 0) as avg_quality
+        FROM products
+    ) p, (
+        SELECT COALESCE(SUM(amount), 0) as total_revenue,
+               COUNT(*) as total_sales
+        FROM sales
+    ) s
+"""
+
+_SQL_MONTHLY_REVENUE = """
+    SELECT 
+        CAST(strftime('%Y%m', date) AS INTEGER) as month,
+        SUM(total_revenue) as revenue,
+        SUM(total_sales) as sales
+    FROM daily_summary
+    WHERE total_sales > 0
+    GROUP BY month
+    ORDER BY month DESC
+    LIMIT 12
+"""
+
+_SQL_ROLLUP_MISSING = """
+    SELECT NOT EXISTS (SELECT 1 FROM daily_summary)
+       AND (EXISTS (SELECT 1 FROM products) OR EXISTS (SELECT 1 FROM sales))
+"""
+
+_SQL_TOP_PRODUCTS = """
+    SELECT 
+        p.title,
+        p.niche,
+        p.price,
+        (SELECT COUNT(*) FROM sales s WHERE s.product_id = p.id) as sales_count,
+        (SELECT COALESCE(SUM(s.amount), 0) FROM sales s WHERE s.product_id = p.id) as total_revenue
+    FROM products p
+    ORDER BY total_revenue DESC
+    LIMIT 10
+"""
+
+_SQL_NICHE_PERFORMANCE = """
+    SELECT 
+        p.niche,
+        p.products_count,
+        p.avg_quality,
+        p.avg_price,
+        COALESCE(s.total_sales, 0) as total_sales,
+        COALESCE(s.total_revenue, 0) as total_revenue
+    FROM (
+        SELECT niche,
+               COUNT(*) as products_count,
+               COALESCE(AVG(quality_score), 0) as avg_quality,
+               COALESCE(AVG(price), 0) as avg_price
+        FROM products
+        GROUP BY niche
+    ) p
+    LEFT JOIN (
+        SELECT pr.niche,
+               COUNT(*) as total_sales,
+               SUM(sa.amount) as total_revenue
+        FROM sales sa
+        JOIN products pr ON pr.id = sa.product_id
+        GROUP BY pr.niche
+    ) s ON s.niche = p.niche
+    ORDER BY total_revenue DESC
+"""
+
+_SQL_REVENUE_HISTORY = """
+    SELECT date, total_revenue as daily_revenue
+    FROM daily_summary
+    WHERE date >= ? AND total_sales > 0
+    ORDER BY date
+"""
+
 class AnalyticsTracker:
     """Comprehensive analytics and performance tracking"""
     
@@ -19,57 +227,63 @@ class AnalyticsTracker:
         self.config = config
         self.db_path = "nosyt_analytics.db"
         self.conn = None
+        # Serializes writes on the shared connection so concurrent writers never interleave transactions
+        self._write_lock = asyncio.Lock()
+        self.read_pool_size = 4
+        self._read_pool: Optional[asyncio.Queue] = None
+        self._report_cache: Dict[Tuple[str, str], Tuple[float, Tuple[int, int, int], Any]] = {}
+        # Bumped on daily_summary writes that add no product/sale rows, which the rowid watermark misses
+        self._summary_version = 0
         
     async def initialize(self):
         """Initialize analytics database"""
-        self.conn = sqlite3.connect(self.db_path)
+        self.conn = await self._connect()
         await self.create_tables()
+        
+        # Pool of readers so report queries run in parallel and don't queue behind writes (WAL allows both)
+        self._read_pool = asyncio.Queue(maxsize=self.read_pool_size)
+        for _ in range(self.read_pool_size):
+            self._read_pool.put_nowait(await self._connect(read_only=True))
         logger.info("✅ Analytics system initialized")
     
+    async def _connect(self, read_only: bool = False) -> aiosqlite.Connection:
+        """Open a tuned connection to the analytics database"""
+        conn = await aiosqlite.connect(self.db_path)
+        await conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+        """)
+        if read_only:
+            await conn.execute("PRAGMA query_only=1")
+        return conn
+    
     async def create_tables(self):
         """Create analytics database tables"""
-        cursor = self.conn.cursor()
-        
         # Products table
-        cursor.execute("""
+        await self.conn.execute("""
             CREATE TABLE IF NOT EXISTS products (
                 id TEXT PRIMARY KEY,
                 title TEXT,
                 niche TEXT,
                 quality_score REAL,
                 price INTEGER,
-                created_at TIMESTAMP,
+                created_at INTEGER,
                 whop_product_id TEXT
             )
         """)
         
         # Sales table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sales (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_id TEXT,
-                amount INTEGER,
-                customer_email TEXT,
-                sale_date TIMESTAMP,
-                platform TEXT,
-                FOREIGN KEY (product_id) REFERENCES products (id)
-            )
-        """)
+        await self.conn.execute(_SALES_TABLE_SQL)
+        await self._migrate_timestamps()
         
-        # Performance metrics table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS performance_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_id TEXT,
-                metric_name TEXT,
-                metric_value REAL,
-                recorded_at TIMESTAMP,
-                FOREIGN KEY (product_id) REFERENCES products (id)
-            )
-        """)
+        # performance_metrics was declared but never written; drop it from older databases
+        await self.conn.execute("DROP TABLE IF EXISTS performance_metrics")
         
         # Daily summary table
-        cursor.execute("""
+        await self.conn.execute("""
             CREATE TABLE IF NOT EXISTS daily_summary (
                 date DATE PRIMARY KEY,
                 products_created INTEGER,
@@ -80,215 +294,341 @@ class AnalyticsTracker:
             )
         """)
         
-        self.conn.commit()
+        # Indexes for report filters and product/sales joins
+        await self.conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_products_created ON products(created_at);
+            CREATE INDEX IF NOT EXISTS idx_products_niche_created ON products(niche, created_at);
+            CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(sale_date);
+            CREATE INDEX IF NOT EXISTS idx_sales_product ON sales(product_id);
+            CREATE INDEX IF NOT EXISTS idx_sales_date_amount ON sales(sale_date, amount);
+            CREATE INDEX IF NOT EXISTS idx_sales_day ON sales(sale_day);
+            CREATE INDEX IF NOT EXISTS idx_sales_month ON sales(sale_month);
+        """)
+        
+        await self.conn.commit()
+        
+        # Databases from before the incremental rollup have raw rows but no daily_summary; backfill once
+        async with self.conn.execute(_SQL_ROLLUP_MISSING) as cursor:
+            (rollup_missing,) = await cursor.fetchone()
+        if rollup_missing:
+            await self.rebuild_daily_summary()
+        
         logger.info("📁 Analytics database tables created")
     
+    async def _migrate_timestamps(self):
+        """Convert tables written with ISO-string timestamps to integer Unix seconds"""
+        async with self.conn.execute("PRAGMA table_xinfo(sales)") as cursor:
+            columns = {row[1]: row[6] for row in await cursor.fetchall()}  # name -> hidden
+        
+        if columns.get("sale_day") != 0 or columns.get("sale_month") != 0:
+            # sale_day/sale_month are missing or generated (UTC-only) columns - rebuild the table
+            await self.conn.executescript(f"""
+                ALTER TABLE sales RENAME TO sales_old;
+                {_SALES_TABLE_SQL};
+                INSERT INTO sales (id, product_id, amount, customer_email, sale_date, platform)
+                SELECT id, product_id, amount, customer_email, sale_date, platform FROM sales_old;
+                DROP TABLE sales_old;
+            """)
+        
+        # Stored strings are naive local time; the 'utc' modifier converts them to epoch correctly
+        await self.conn.executescript("""
+            UPDATE products SET created_at = CAST(strftime('%s', created_at, 'utc') AS INTEGER)
+            WHERE typeof(created_at) = 'text';
+            UPDATE sales SET sale_date = CAST(strftime('%s', sale_date, 'utc') AS INTEGER)
+            WHERE typeof(sale_date) = 'text';
+            UPDATE sales SET
+                sale_day = CAST(strftime('%Y%m%d', sale_date, 'unixepoch', 'localtime') AS INTEGER),
+                sale_month = CAST(strftime('%Y%m', sale_date, 'unixepoch', 'localtime') AS INTEGER)
+            WHERE sale_day IS NULL AND sale_date IS NOT NULL;
+        """)
+    
     async def track_product_creation(self, product_ids: List[str]):
         """Track newly created products"""
-        cursor = self.conn.cursor()
-        
-        for product_id in product_ids:
-            # In a real implementation, you'd get this data from the creation process
-            cursor.execute("""
-                INSERT OR REPLACE INTO products 
-                (id, title, niche, quality_score, price, created_at, whop_product_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                product_id,
-                f"AI Prompt #{product_id[-6:]}",
-                "Business & Marketing",  # Would come from actual data
-                0.85,  # Would come from actual data
-                45,    # Would come from actual data
-                datetime.now(),
-                product_id
-            ))
-        
-        self.conn.commit()
-        logger.info(f"📊 Tracked {len(product_ids)} product creations")
+        ts = int(time.time())
+        
+        async with self._write_lock:
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Already-tracked products keep their original row and are not counted again
+                new_ids = list(dict.fromkeys(product_ids))
+                existing = set()
+                for i in range(0, len(new_ids), _ID_LOOKUP_CHUNK):
+                    chunk = new_ids[i:i + _ID_LOOKUP_CHUNK]
+                    async with self.conn.execute(
+                        f"SELECT id FROM products WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                    ) as cursor:
+                        existing.update(row[0] for row in await cursor.fetchall())
+                
+                # In a real implementation, you'd get this data from the creation process
+                rows = [
+                    (
+                        product_id,
+                        "AI Prompt #" + product_id[-6:],
+                        "Business & Marketing",  # Would come from actual data
+                        0.85,  # Would come from actual data
+                        45,    # Would come from actual data
+                        ts,
+                        product_id
+                    )
+                    for product_id in new_ids
+                    if product_id not in existing
+                ]
+                
+                await self.conn.executemany(_SQL_INSERT_PRODUCT, rows)
+                
+                if rows:
+                    avg_quality = sum(row[3] for row in rows) / len(rows)
+                    await self._rollup_products(datetime.fromtimestamp(ts).date(), len(rows), avg_quality)
+                
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+        logger.info(f"📊 Tracked {len(rows)} product creations")
     
     async def track_sale(self, product_id: str, amount: int, customer_email: str, platform: str = "whop"):
         """Track a sale"""
-        cursor = self.conn.cursor()
+        ts = int(time.time())
+        day = datetime.fromtimestamp(ts).date()
+        sale_day, sale_month = self._day_buckets(day)
+        async with self._write_lock:
+            try:
+                await self.conn.execute(
+                    _SQL_INSERT_SALE, (product_id, amount, customer_email, ts, platform, sale_day, sale_month)
+                )
+                await self._rollup_sales(day, 1, amount)
+                
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+        logger.info(f"💰 Tracked sale: ${amount/100:.2f} for product {product_id}")
+    
+    async def track_sales_batch(self, sales: List[Tuple[str, int, str, str]]):
+        """Track a batch of (product_id, amount, customer_email, platform) sales in one transaction"""
+        if not sales:
+            return
+        
+        ts = int(time.time())
+        day = datetime.fromtimestamp(ts).date()
+        sale_day, sale_month = self._day_buckets(day)
+        rows = [
+            (product_id, amount, customer_email, ts, platform, sale_day, sale_month)
+            for product_id, amount, customer_email, platform in sales
+        ]
+        
+        total = sum(amount for _, amount, _, _ in sales)
+        
+        async with self._write_lock:
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                await self.conn.executemany(_SQL_INSERT_SALE, rows)
+                await self._rollup_sales(day, len(sales), total)
+                
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+        logger.info(f"💰 Tracked {len(sales)} sales: ${total/100:.2f}")
+    
+    @staticmethod
+    def _day_buckets(day) -> Tuple[int, int]:
+        """Integer (YYYYMMDD, YYYYMM) buckets for a calendar day"""
+        return day.year * 10000 + day.month * 100 + day.day, day.year * 100 + day.month
+    
+    @staticmethod
+    def _epoch(moment: datetime) -> int:
+        """Unix seconds for a naive local datetime"""
+        return int(moment.timestamp())
+    
+    async def _rollup_products(self, day, count: int, avg_quality: float):
+        """Fold newly created products into the daily_summary rollup"""
+        await self.conn.execute(_SQL_ROLLUP_PRODUCTS, (day, count, avg_quality))
+    
+    async def _rollup_sales(self, day, count: int, revenue: int):
+        """Fold new sales into the daily_summary rollup"""
+        await self.conn.execute(_SQL_ROLLUP_SALES, (day, revenue, count))
+    
+    async def rebuild_daily_summary(self):
+        """Recompute the daily_summary rollup from the raw products and sales tables"""
+        async with self._write_lock:
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                await self.conn.execute("DELETE FROM daily_summary")
+                await self.conn.execute("""
+                    INSERT INTO daily_summary 
+                    (date, products_created, total_revenue, total_sales, avg_quality_score, top_niche)
+                    SELECT
+                        d.date,
+                        COALESCE(p.products_created, 0),
+                        COALESCE(s.total_revenue, 0),
+                        COALESCE(s.total_sales, 0),
+                        COALESCE(p.avg_quality_score, 0),
+                        (SELECT niche FROM products
+                         WHERE DATE(created_at, 'unixepoch', 'localtime') = d.date
+                         GROUP BY niche ORDER BY COUNT(*) DESC LIMIT 1)
+                    FROM (
+                        SELECT DATE(created_at, 'unixepoch', 'localtime') AS date FROM products
+                        UNION
+                        SELECT DATE(sale_date, 'unixepoch', 'localtime') AS date FROM sales
+                    ) d
+                    LEFT JOIN (
+                        SELECT DATE(created_at, 'unixepoch', 'localtime') AS date, COUNT(*) AS products_created,
+                               AVG(quality_score) AS avg_quality_score
+                        FROM products GROUP BY DATE(created_at, 'unixepoch', 'localtime')
+                    ) p ON p.date = d.date
+                    LEFT JOIN (
+                        SELECT DATE(sale_date, 'unixepoch', 'localtime') AS date, COUNT(*) AS total_sales,
+                               SUM(amount) AS total_revenue
+                        FROM sales GROUP BY DATE(sale_date, 'unixepoch', 'localtime')
+                    ) s ON s.date = d.date
+                """)
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+            self._summary_version += 1
+        logger.info("📁 Daily summary rebuilt from raw analytics tables")
+    
+    async def _data_watermark(self) -> Tuple[int, int, int]:
+        """Highest product/sale rowids and the daily_summary version, used to detect writes since a report was cached"""
+        products, sales = await self._fetchone(_SQL_WATERMARK)
+        return products, sales, self._summary_version
+    
+    @asynccontextmanager
+    async def _read(self):
+        """Borrow a read-only connection from the pool"""
+        conn = await self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put_nowait(conn)
+    
+    async def _fetchone(self, sql: str, params: Union[Tuple, Dict] = ()):
+        """Run a read-only query on a pooled reader and return the first row"""
+        async with self._read() as conn:
+            async with conn.execute(sql, params) as cursor:
+                return await cursor.fetchone()
+    
+    async def _fetchall(self, sql: str, params: Union[Tuple, Dict] = ()) -> List:
+        """Run a read-only query on a pooled reader and return all rows"""
+        async with self._read() as conn:
+            async with conn.execute(sql, params) as cursor:
+                return await cursor.fetchall()
+    
+    def _get_cached_report(self, key: Tuple[str, str], watermark: Tuple[int, int, int]) -> Optional[Any]:
+        """Return a cached report if it is within the TTL and no rows were written since"""
+        cached = self._report_cache.get(key)
+        if cached is None:
+            return None
         
-        cursor.execute("""
-            INSERT INTO sales (product_id, amount, customer_email, sale_date, platform)
-            VALUES (?, ?, ?, ?, ?)
-        """, (product_id, amount, customer_email, datetime.now(), platform))
+        cached_at, cached_watermark, report = cached
+        if time.monotonic() - cached_at > self.config.REPORT_CACHE_TTL or cached_watermark != watermark:
+            del self._report_cache[key]
+            return None
         
-        self.conn.commit()
-        logger.info(f"💰 Tracked sale: ${amount/100:.2f} for product {product_id}")
+        return report
+    
+    def _store_report(self, key: Tuple[str, str], watermark: Tuple[int, int, int], report: Any):
+        """Cache a freshly computed report"""
+        self._report_cache[key] = (time.monotonic(), watermark, report)
     
     async def generate_daily_report(self) -> Dict:
         """Generate daily performance report"""
-        cursor = self.conn.cursor()
         today = datetime.now().date()
         
-        # Products created today
-        cursor.execute("""
-            SELECT COUNT(*) FROM products WHERE DATE(created_at) = ?
-        """, (today,))
-        products_created = cursor.fetchone()[0]
-        
-        # Revenue today
-        cursor.execute("""
-            SELECT COALESCE(SUM(amount), 0) FROM sales WHERE DATE(sale_date) = ?
-        """, (today,))
-        daily_revenue = cursor.fetchone()[0]
-        
-        # Sales count today
-        cursor.execute("""
-            SELECT COUNT(*) FROM sales WHERE DATE(sale_date) = ?
-        """, (today,))
-        daily_sales = cursor.fetchone()[0]
-        
-        # Average quality score
-        cursor.execute("""
-            SELECT COALESCE(AVG(quality_score), 0) FROM products WHERE DATE(created_at) = ?
-        """, (today,))
-        avg_quality = cursor.fetchone()[0]
-        
-        # Top performing niche
-        cursor.execute("""
-            SELECT niche, COUNT(*) as count FROM products 
-            WHERE DATE(created_at) = ? GROUP BY niche ORDER BY count DESC LIMIT 1
-        """, (today,))
-        top_niche_result = cursor.fetchone()
-        top_niche = top_niche_result[0] if top_niche_result else "N/A"
-        
-        report = {
-            "date": today.isoformat(),
-            "products_created": products_created,
-            "daily_revenue": daily_revenue / 100,  # Convert cents to dollars
-            "daily_sales": daily_sales,
-            "avg_quality_score": round(avg_quality, 2),
-            "top_niche": top_niche,
-            "conversion_rate": (daily_sales / max(products_created, 1)) * 100
-        }
-        
-        # Store daily summary
-        cursor.execute("""
-            INSERT OR REPLACE INTO daily_summary 
-            (date, products_created, total_revenue, total_sales, avg_quality_score, top_niche)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (today, products_created, daily_revenue, daily_sales, avg_quality, top_niche))
-        
-        self.conn.commit()
+        cache_key = ("daily", today.isoformat())
+        watermark = await self._data_watermark()
+        cached = self._get_cached_report(cache_key, watermark)
+        if cached is not None:
+            return cached
+        
+        midnight = datetime.combine(today, datetime.min.time())
+        day_start = self._epoch(midnight)
+        day_end = self._epoch(midnight + timedelta(days=1))
+        
+        # Read and store under the write lock so the stored row reflects every committed write
+        # and no write lands between the reads and the INSERT OR REPLACE
+        async with self._write_lock:
+            watermark = await self._data_watermark()
+            
+            # Products created today, sales today and the top performing niche
+            (products_created, avg_quality), (daily_sales, daily_revenue), top_niche_result = await asyncio.gather(
+                self._fetchone(_SQL_DAILY_PRODUCTS, (day_start, day_end)),
+                self._fetchone(_SQL_DAILY_SALES, (self._day_buckets(today)[0],)),
+                self._fetchone(_SQL_DAILY_TOP_NICHE, (day_start, day_end))
+            )
+            top_niche = top_niche_result[0] if top_niche_result else "N/A"
+            
+            report = {
+                "date": today.isoformat(),
+                "products_created": products_created,
+                "daily_revenue": daily_revenue / 100,  # Convert cents to dollars
+                "daily_sales": daily_sales,
+                "avg_quality_score": round(avg_quality, 2),
+                "top_niche": top_niche,
+                "conversion_rate": (daily_sales / max(products_created, 1)) * 100
+            }
+            
+            # Store daily summary
+            try:
+                await self.conn.execute(
+                    _SQL_STORE_DAILY_SUMMARY,
+                    (today, products_created, daily_revenue, daily_sales, avg_quality, top_niche)
+                )
+                
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+            self._summary_version += 1
+            watermark = (*watermark[:2], self._summary_version)
+        self._store_report(cache_key, watermark, report)
         
         logger.info(f"📈 Daily Report: {json.dumps(report, indent=2)}")
         return report
     
     async def generate_weekly_report(self) -> Dict:
         """Generate weekly performance report"""
-        cursor = self.conn.cursor()
         week_ago = (datetime.now() - timedelta(days=7)).date()
+        week_start = self._epoch(datetime.combine(week_ago, datetime.min.time()))
         
-        # Weekly totals
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as products,
-                COALESCE(SUM(CASE WHEN s.amount IS NOT NULL THEN s.amount ELSE 0 END), 0) as revenue,
-                COUNT(s.id) as sales,
-                COALESCE(AVG(p.quality_score), 0) as avg_quality
-            FROM products p
-            LEFT JOIN sales s ON p.id = s.product_id
-            WHERE DATE(p.created_at) >= ?
-        """, (week_ago,))
-        
-        result = cursor.fetchone()
-        
-        # Top niches this week
-        cursor.execute("""
-            SELECT niche, COUNT(*) as count, COALESCE(AVG(quality_score), 0) as avg_quality
-            FROM products WHERE DATE(created_at) >= ?
-            GROUP BY niche ORDER BY count DESC LIMIT 5
-        """, (week_ago,))
-        
-        top_niches = cursor.fetchall()
-        
-        # Performance trends
-        cursor.execute("""
-            SELECT DATE(created_at) as date, COUNT(*) as daily_products,
-                   COALESCE(AVG(quality_score), 0) as daily_quality
-            FROM products WHERE DATE(created_at) >= ?
-            GROUP BY DATE(created_at) ORDER BY date
-        """, (week_ago,))
-        
-        daily_trends = cursor.fetchall()
-        
-        report = {
-            "period": "7_days",
-            "total_products": result[0],
-            "total_revenue": result[1] / 100,
-            "total_sales": result[2],
-            "avg_quality_score": round(result[3], 2),
-            "conversion_rate": (result[2] / max(result[0], 1)) * 100,
-            "top_niches": [
-                {"niche": niche, "count": count, "avg_quality": round(quality, 2)}
-                for niche, count, quality in top_niches
-            ],
-            "daily_trends": [
-                {"date": date, "products": products, "quality": round(quality, 2)}
-                for date, products, quality in daily_trends
-            ]
-        }
+        cache_key = ("weekly", week_ago.isoformat())
+        watermark = await self._data_watermark()
+        cached = self._get_cached_report(cache_key, watermark)
+        if cached is not None:
+            return cached
+        
+        # Totals and trends from the incrementally maintained daily rollup, top niches
+        # from this week's products - assembled into the final JSON document by SQLite
+        row = await self._fetchone(_SQL_WEEKLY_REPORT, {"week_ago": week_ago, "week_start": week_start})
+        report = json.loads(row[0])
         
+        self._store_report(cache_key, watermark, report)
         return report
     
     async def get_revenue_metrics(self) -> Dict:
         """Get comprehensive revenue metrics"""
-        cursor = self.conn.cursor()
-        
-        # Total metrics
-        cursor.execute("""
-            SELECT 
-                COUNT(DISTINCT p.id) as total_products,
-                COALESCE(SUM(s.amount), 0) as total_revenue,
-                COUNT(s.id) as total_sales,
-                COALESCE(AVG(p.quality_score), 0) as avg_quality
-            FROM products p
-            LEFT JOIN sales s ON p.id = s.product_id
-        """)
-        
-        totals = cursor.fetchone()
-        
-        # Monthly revenue
-        cursor.execute("""
-            SELECT 
-                strftime('%Y-%m', sale_date) as month,
-                SUM(amount) as revenue,
-                COUNT(*) as sales
-            FROM sales
-            GROUP BY strftime('%Y-%m', sale_date)
-            ORDER BY month DESC
-            LIMIT 12
-        """)
-        
-        monthly_revenue = cursor.fetchall()
-        
-        # Top performing products
-        cursor.execute("""
-            SELECT 
-                p.title,
-                p.niche,
-                p.price,
-                COUNT(s.id) as sales_count,
-                COALESCE(SUM(s.amount), 0) as total_revenue
-            FROM products p
-            LEFT JOIN sales s ON p.id = s.product_id
-            GROUP BY p.id
-            ORDER BY total_revenue DESC
-            LIMIT 10
-        """)
-        
-        top_products = cursor.fetchall()
-        
-        return {
+        cache_key = ("revenue", datetime.now().date().isoformat())
+        watermark = await self._data_watermark()
+        cached = self._get_cached_report(cache_key, watermark)
+        if cached is not None:
+            return cached
+        
+        # Total metrics, monthly revenue and top performing products
+        totals, monthly_revenue, top_products = await asyncio.gather(
+            self._fetchone(_SQL_REVENUE_TOTALS),
+            self._fetchall(_SQL_MONTHLY_REVENUE),
+            self._fetchall(_SQL_TOP_PRODUCTS)
+        )
+        
+        metrics = {
             "total_products": totals[0],
             "total_revenue": totals[1] / 100,
             "total_sales": totals[2],
             "avg_quality_score": round(totals[3], 2),
             "monthly_revenue": [
-                {"month": month, "revenue": revenue/100, "sales": sales}
+                {"month": f"{month // 100:04d}-{month % 100:02d}", "revenue": revenue/100, "sales": sales}
                 for month, revenue, sales in monthly_revenue
             ],
             "top_products": [
@@ -302,26 +642,13 @@ class AnalyticsTracker:
                 for title, niche, price, sales_count, total_revenue in top_products
             ]
         }
+        
+        self._store_report(cache_key, watermark, metrics)
+        return metrics
     
     async def get_niche_performance(self) -> Dict:
         """Get performance metrics by niche"""
-        cursor = self.conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                p.niche,
-                COUNT(DISTINCT p.id) as products_count,
-                COALESCE(AVG(p.quality_score), 0) as avg_quality,
-                COALESCE(AVG(p.price), 0) as avg_price,
-                COUNT(s.id) as total_sales,
-                COALESCE(SUM(s.amount), 0) as total_revenue
-            FROM products p
-            LEFT JOIN sales s ON p.id = s.product_id
-            GROUP BY p.niche
-            ORDER BY total_revenue DESC
-        """)
-        
-        niche_data = cursor.fetchall()
+        niche_data = await self._fetchall(_SQL_NICHE_PERFORMANCE)
         
         return {
             "niche_performance": [
@@ -340,43 +667,61 @@ class AnalyticsTracker:
     
     async def predict_revenue(self, days_ahead: int = 30) -> Dict:
         """Simple revenue prediction based on trends"""
-        cursor = self.conn.cursor()
-        
-        # Get last 30 days of data for trend analysis
-        cursor.execute("""
-            SELECT DATE(sale_date) as date, COALESCE(SUM(amount), 0) as daily_revenue
-            FROM sales
-            WHERE sale_date >= date('now', '-30 days')
-            GROUP BY DATE(sale_date)
-            ORDER BY date
-        """)
-        
-        historical_data = cursor.fetchall()
+        # Get last 30 days of data for trend analysis, shared across calls for the same day
+        today = datetime.now().date()
+        cache_key = ("revenue_history", today.isoformat())
+        watermark = await self._data_watermark()
+        historical_data = self._get_cached_report(cache_key, watermark)
+        if historical_data is None:
+            historical_data = await self._fetchall(_SQL_REVENUE_HISTORY, (today - timedelta(days=30),))
+            self._store_report(cache_key, watermark, historical_data)
         
         if len(historical_data) < 7:  # Need at least a week of data
             return {"prediction": "Insufficient data for prediction"}
         
-        # Simple linear trend calculation
-        revenues = [row[1] for row in historical_data]
-        avg_daily_revenue = sum(revenues) / len(revenues)
-        
-        # Calculate trend (very simplified)
-        if len(revenues) > 1:
-            trend = (revenues[-1] - revenues[0]) / len(revenues)
+        # Least-squares linear trend over the day offsets of the observed days
+        days = np.array([row[0] for row in historical_data], dtype="datetime64[D]").astype(np.float64)
+        days -= days[0]
+        revenues = np.fromiter((row[1] for row in historical_data), dtype=np.float64, count=len(historical_data))
+        slope, intercept = np.polyfit(days, revenues, 1)
+        avg_daily_revenue = float(revenues.mean())
+        
+        # Sum of the fitted line over the days following the last observation
+        predicted_revenue = days_ahead * (intercept + slope * (days[-1] + (days_ahead + 1) / 2))
+        
+        # Confidence from how tightly the daily revenue follows the trend line
+        residual_std = float(np.std(revenues - (slope * days + intercept)))
+        relative_error = residual_std / max(avg_daily_revenue, 1)
+        if len(historical_data) < 14 or relative_error > 0.5:
+            confidence = "low"
+        elif relative_error > 0.25:
+            confidence = "medium"
         else:
-            trend = 0
-        
-        predicted_revenue = (avg_daily_revenue + trend * days_ahead) * days_ahead
+            confidence = "high"
         
         return {
             "prediction_period_days": days_ahead,
             "historical_avg_daily_revenue": avg_daily_revenue / 100,
-            "predicted_total_revenue": max(predicted_revenue / 100, 0),
-            "confidence": "low" if len(historical_data) < 14 else "medium"
+            "daily_revenue_trend": float(slope) / 100,
+            "predicted_total_revenue": max(float(predicted_revenue) / 100, 0),
+            "confidence": confidence
         }
     
+    async def generate_all_reports(self) -> Dict:
+        """Generate the daily, weekly and revenue reports concurrently"""
+        daily, weekly, revenue = await asyncio.gather(
+            self.generate_daily_report(),
+            self.generate_weekly_report(),
+            self.get_revenue_metrics()
+        )
+        
+        return {"daily": daily, "weekly": weekly, "revenue": revenue}
+    
     async def close(self):
-        """Close database connection"""
+        """Close database connections"""
+        if self._read_pool:
+            while not self._read_pool.empty():
+                await self._read_pool.get_nowait().close()
         if self.conn:
-            self.conn.close()
+            await self.conn.close()
             logger.info("📁 Analytics database connection closed")
\ No newline at end of file
@@ -3,76 +3,69 @@
 Automation Scheduler for Nosyt AI Prompt System
 """
 
-import schedule
-import asyncio
-from datetime import datetime, time
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
 import logging
-from typing import Callable, List
+from datetime import datetime
+from typing import Callable, Optional
 
 logger = logging.getLogger(__name__)
 
 class AutomationScheduler:
     """Handles all automated scheduling tasks"""
     
-    def __init__(self, config):
+    def __init__(self, config, analytics=None):
         self.config = config
+        self.analytics = analytics
         self.scheduled_tasks = []
         self.running = False
+        self.sched = AsyncIOScheduler()
         
     def schedule_daily_automation(self, automation_func: Callable):
         """Schedule daily automation tasks"""
         
         # Main generation at 9 AM
-        schedule.every().day.at(self.config.GENERATION_SCHEDULE).do(
-            self._run_async_task, automation_func
-        )
+        self._add_job(automation_func, self._daily_trigger(self.config.GENERATION_SCHEDULE))
         
         # Analytics update at 6 PM
-        schedule.every().day.at(self.config.ANALYTICS_SCHEDULE).do(
-            self._run_async_task, self._daily_analytics
-        )
+        self._add_job(self._daily_analytics, self._daily_trigger(self.config.ANALYTICS_SCHEDULE))
         
         # Marketing content at 12 PM
-        schedule.every().day.at(self.config.MARKETING_SCHEDULE).do(
-            self._run_async_task, self._marketing_boost
-        )
+        self._add_job(self._marketing_boost, self._daily_trigger(self.config.MARKETING_SCHEDULE))
         
         # Weekly tasks
-        schedule.every().monday.at("10:00").do(
-            self._run_async_task, self._weekly_report
-        )
+        self._add_job(self._weekly_report, CronTrigger(day_of_week="mon", hour=10, minute=0))
         
         # Hourly health checks
-        schedule.every().hour.do(
-            self._run_async_task, self._health_check
-        )
+        self._add_job(self._health_check, CronTrigger(minute=0))
         
         logger.info("📅 Automation schedule configured")
         logger.info(f"⏰ Daily generation: {self.config.GENERATION_SCHEDULE}")
         logger.info(f"📊 Daily analytics: {self.config.ANALYTICS_SCHEDULE}")
         logger.info(f"📢 Marketing boost: {self.config.MARKETING_SCHEDULE}")
     
-    def _run_async_task(self, coro_func):
-        """Run async function in scheduler"""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # Create new task
-                loop.create_task(coro_func())
-            else:
-                # Run directly
-                loop.run_until_complete(coro_func())
-        except Exception as e:
-            logger.error(f"❌ Scheduled task failed: {str(e)}")
+    def _daily_trigger(self, at: str) -> CronTrigger:
+        """Build a daily cron trigger from an "HH:MM" schedule string"""
+        hour, minute = at.split(":")
+        return CronTrigger(hour=int(hour), minute=int(minute))
     
-    async def run_pending(self):
-        """Run any pending scheduled tasks"""
-        schedule.run_pending()
+    def _add_job(self, coro_func: Callable, trigger: CronTrigger):
+        """Register a coroutine job; backed-up runs are coalesced and never overlap"""
+        job = self.sched.add_job(
+            coro_func,
+            trigger,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=300
+        )
+        self.scheduled_tasks.append(job)
     
     async def _daily_analytics(self):
         """Daily analytics update task"""
         logger.info("📊 Running daily analytics update...")
-        # Implementation would update analytics dashboard
+        if self.analytics:
+            # Daily, weekly and revenue reports are independent reads - run them together
+            await self.analytics.generate_all_reports()
         
     async def _marketing_boost(self):
         """Daily marketing boost task"""
@@ -90,12 +83,28 @@ class AutomationScheduler:
         # Implementation would check system status
         
     def start(self):
-        """Start the scheduler"""
+        """Start the scheduler (must be called from within the running event loop)"""
+        self.sched.start()
         self.running = True
         logger.info("🚀 Automation scheduler started")
         
+        next_run = self.next_run_in()
+        if next_run is not None:
+            logger.info(f"⏭️ Next scheduled job in {next_run / 60:.1f} min")
+        
+    def next_run_in(self) -> Optional[float]:
+        """Seconds until the next job fires, or None before start or with nothing scheduled"""
+        runs = [getattr(job, "next_run_time", None) for job in self.sched.get_jobs()]
+        runs = [run for run in runs if run]
+        if not runs:
+            return None
+        next_run = min(runs)
+        return max(0.0, (next_run - datetime.now(next_run.tzinfo)).total_seconds())
+    
     def stop(self):
         """Stop the scheduler"""
         self.running = False
-        schedule.clear()
+        if self.sched.running:
+            self.sched.shutdown(wait=False)
+        self.scheduled_tasks.clear()
         logger.info("🛑 Automation scheduler stopped")
\ No newline at end of file
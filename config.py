@@ -4,17 +4,109 @@ Configuration settings for Nosyt AI Prompt Automation System
 """
 
 import os
-from typing import Dict, List
-from pydantic import BaseSettings
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Final, FrozenSet, Mapping, Tuple
+from dotenv import load_dotenv
 
-class Config(BaseSettings):
+load_dotenv(".env")
+
+# Profitable Niches (Based on market research)
+PROFITABLE_NICHES: Final[FrozenSet[str]] = frozenset({
+    "Business & Marketing",
+    "Content Creation & Copywriting", 
+    "E-commerce & Sales",
+    "Programming & Development",
+    "Personal Productivity",
+    "Social Media Marketing",
+    "Email Marketing",
+    "SEO & Digital Marketing",
+    "Creative Writing",
+    "Educational Content",
+    "Health & Fitness",
+    "Real Estate",
+    "Finance & Investment",
+    "Customer Service",
+    "Data Analysis"
+})
+
+# AI Model Settings
+AI_MODELS: Final[Mapping[str, str]] = MappingProxyType({
+    "primary": "gpt-4o",
+    "secondary": "claude-3-sonnet",
+    "fallback": "gpt-3.5-turbo"
+})
+
+# Content type -> OpenAI model used by the content creator
+MODEL_ROUTING: Final[Mapping[str, str]] = MappingProxyType({
+    "twitter": "gpt-4o-mini",
+    "linkedin": "gpt-4o-mini",
+    "facebook": "gpt-4o-mini",
+    "instagram": "gpt-4o-mini",
+    "email": "gpt-4o-mini",
+    "blog": "gpt-4o",
+    "press_release": "gpt-4o",
+    "default": "gpt-4o-mini"
+})
+
+# Niche keyword and pricing tables (module-level so lookups don't rebuild them per call)
+_NICHE_KEYWORDS: Final[Mapping[str, Tuple[str, ...]]] = MappingProxyType({
+    "Business & Marketing": (
+        "lead generation", "sales funnel", "customer acquisition",
+        "brand strategy", "market research", "competitive analysis",
+        "business plan", "ROI optimization", "conversion rate"
+    ),
+    "Content Creation & Copywriting": (
+        "blog posts", "sales copy", "email sequences",
+        "social media content", "ad copy", "headlines",
+        "storytelling", "persuasive writing", "content strategy"
+    ),
+    "E-commerce & Sales": (
+        "product descriptions", "Amazon listings", "sales pages",
+        "checkout optimization", "upsell strategies", "cart abandonment",
+        "customer reviews", "product photography", "inventory management"
+    ),
+    "Programming & Development": (
+        "code generation", "debugging", "API documentation",
+        "database design", "testing strategies", "deployment",
+        "performance optimization", "security best practices", "architecture"
+    ),
+    "Personal Productivity": (
+        "time management", "goal setting", "habit formation",
+        "workflow optimization", "task prioritization", "focus techniques",
+        "productivity systems", "motivation", "work-life balance"
+    )
+})
+
+_BASE_PRICES: Final[Mapping[str, int]] = MappingProxyType({
+    "Business & Marketing": 35,
+    "E-commerce & Sales": 45,
+    "Programming & Development": 50,
+    "Content Creation & Copywriting": 25,
+    "Personal Productivity": 20
+})
+
+# Environment values that switch a flag on; anything else, including "false" and "0", leaves it off
+_TRUTHY: Final[FrozenSet[str]] = frozenset({"1", "true", "yes", "on"})
+
+def _env(name: str, default: str = ""):
+    """Dataclass field read from the environment when Config is instantiated"""
+    return field(default_factory=lambda: os.getenv(name, default))
+
+def _env_flag(name: str, default: bool = False):
+    """Boolean dataclass field read from the environment; only 1/true/yes/on (any case) enable it"""
+    return field(default_factory=lambda: os.getenv(name, "1" if default else "").strip().lower() in _TRUTHY)
+
+@dataclass(frozen=True)
+class Config:
     """System configuration"""
     
     # API Keys (Set these in your environment)
-    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
-    CLAUDE_API_KEY: str = os.getenv("CLAUDE_API_KEY", "")
-    WHOP_API_KEY: str = os.getenv("WHOP_API_KEY", "")
-    STRIPE_API_KEY: str = os.getenv("STRIPE_API_KEY", "")
+    OPENAI_API_KEY: str = _env("OPENAI_API_KEY")
+    CLAUDE_API_KEY: str = _env("CLAUDE_API_KEY")
+    WHOP_API_KEY: str = _env("WHOP_API_KEY")
+    STRIPE_API_KEY: str = _env("STRIPE_API_KEY")
     
     # Business Settings
     COMPANY_NAME: str = "Nosyt LLC"
@@ -27,36 +119,15 @@ class Config(BaseSettings):
     BASE_PRICE_RANGE: tuple = (15, 50)
     PREMIUM_PRICE_RANGE: tuple = (97, 297)
     
-    # Profitable Niches (Based on market research)
-    PROFITABLE_NICHES: List[str] = [
-        "Business & Marketing",
-        "Content Creation & Copywriting", 
-        "E-commerce & Sales",
-        "Programming & Development",
-        "Personal Productivity",
-        "Social Media Marketing",
-        "Email Marketing",
-        "SEO & Digital Marketing",
-        "Creative Writing",
-        "Educational Content",
-        "Health & Fitness",
-        "Real Estate",
-        "Finance & Investment",
-        "Customer Service",
-        "Data Analysis"
-    ]
-    
-    # AI Model Settings
-    AI_MODELS: Dict[str, str] = {
-        "primary": "gpt-4",
-        "secondary": "claude-3-sonnet",
-        "fallback": "gpt-3.5-turbo"
-    }
-    
     # WHOP Integration Settings
     WHOP_BASE_URL: str = "https://api.whop.com/v1"
     AUTO_PUBLISH: bool = True
     AUTO_PRICING: bool = True
+    WHOP_CONCURRENCY: int = 8  # Product uploads in flight at once
+    WHOP_RPM: int = 600        # Request budget; WHOP's rate-limit headers tighten it at runtime
+    WHOP_MAX_CONNECTIONS: int = 16  # Pooled keep-alive connections to the WHOP API host
+    WHOP_MOCK: bool = _env_flag("WHOP_MOCK")  # true to skip the WHOP API and create mock products
+    WHOP_DEDUP_TTL: int = 604800  # Seconds an uploaded product is remembered and not re-posted (7 days)
     
     # Automation Schedule
     GENERATION_SCHEDULE: str = "09:00"  # 9 AM daily
@@ -67,6 +138,28 @@ class Config(BaseSettings):
     MONTHLY_REVENUE_TARGET: int = 5000
     DAILY_PRODUCT_TARGET: int = 10
     
+    # OpenAI Settings
+    OPENAI_MAX_CONCURRENCY: int = 8  # Requests in flight at once
+    OPENAI_MAX_CONNECTIONS: int = 64  # HTTP connection pool size
+    OPENAI_RPM: int = 500            # Requests per minute
+    OPENAI_TPM: int = 200000         # Tokens per minute
+    OPENAI_STREAM: bool = True       # Stream completions instead of waiting for the full response
+    CONTENT_CACHE_TTL: int = 604800  # Seconds to reuse a generated social post (7 days)
+    PROMPT_CACHE_TTL: int = 604800   # Seconds to reuse a cached prompt-generation response (7 days)
+    
+    # Email Settings
+    SMTP_HOST: str = _env("SMTP_HOST")  # Emails are only logged when unset
+    SMTP_PORT: str = _env("SMTP_PORT", "587")
+    SMTP_USER: str = _env("SMTP_USER")
+    SMTP_PASS: str = _env("SMTP_PASS")
+    EMAIL_FROM: str = "noreply@nosyt.com"
+    EMAIL_WORKERS: int = 8  # Persistent SMTP sessions draining the send queue
+    
+    # Analytics Settings
+    REPORT_CACHE_TTL: int = 300  # Seconds to reuse a computed report
+    CUSTOMER_ANALYTICS_TTL: int = 30  # Seconds to reuse customer analytics
+    DASHBOARD_CACHE_TTL: int = 60  # Seconds to reuse the rendered dashboard page
+    
     # Quality Control
     MIN_PROMPT_QUALITY_SCORE: float = 0.8
     MAX_RETRIES: int = 3
@@ -77,60 +170,42 @@ class Config(BaseSettings):
     TEMPLATES_DIR: str = "templates"
     
     # Database Settings
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///nosyt_automation.db")
+    DATABASE_URL: str = _env("DATABASE_URL", "sqlite:///nosyt_automation.db")
     
     # Notification Settings
-    DISCORD_WEBHOOK: str = os.getenv("DISCORD_WEBHOOK", "")
-    TELEGRAM_BOT_TOKEN: str = os.getenv("TELEGRAM_BOT_TOKEN", "")
-    TELEGRAM_CHAT_ID: str = os.getenv("TELEGRAM_CHAT_ID", "")
+    DISCORD_WEBHOOK: str = _env("DISCORD_WEBHOOK")
+    TELEGRAM_BOT_TOKEN: str = _env("TELEGRAM_BOT_TOKEN")
+    TELEGRAM_CHAT_ID: str = _env("TELEGRAM_CHAT_ID")
+    
+    @property
+    def PROFITABLE_NICHES(self) -> FrozenSet[str]:
+        """Read-only set of niches to generate for"""
+        return PROFITABLE_NICHES
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    @property
+    def AI_MODELS(self) -> Mapping[str, str]:
+        """Read-only model routing table"""
+        return AI_MODELS
     
-    def get_niche_keywords(self, niche: str) -> List[str]:
+    @property
+    def MODEL_ROUTING(self) -> Mapping[str, str]:
+        """Read-only content type to model table"""
+        return MODEL_ROUTING
+    
+    def get_niche_keywords(self, niche: str) -> Tuple[str, ...]:
         """Get relevant keywords for each niche"""
-        niche_keywords = {
-            "Business & Marketing": [
-                "lead generation", "sales funnel", "customer acquisition",
-                "brand strategy", "market research", "competitive analysis",
-                "business plan", "ROI optimization", "conversion rate"
-            ],
-            "Content Creation & Copywriting": [
-                "blog posts", "sales copy", "email sequences",
-                "social media content", "ad copy", "headlines",
-                "storytelling", "persuasive writing", "content strategy"
-            ],
-            "E-commerce & Sales": [
-                "product descriptions", "Amazon listings", "sales pages",
-                "checkout optimization", "upsell strategies", "cart abandonment",
-                "customer reviews", "product photography", "inventory management"
-            ],
-            "Programming & Development": [
-                "code generation", "debugging", "API documentation",
-                "database design", "testing strategies", "deployment",
-                "performance optimization", "security best practices", "architecture"
-            ],
-            "Personal Productivity": [
-                "time management", "goal setting", "habit formation",
-                "workflow optimization", "task prioritization", "focus techniques",
-                "productivity systems", "motivation", "work-life balance"
-            ]
-        }
-        
-        return niche_keywords.get(niche, [])
+        return _NICHE_KEYWORDS.get(niche, ())
     
-    def get_pricing_strategy(self, niche: str, quality_score: float) -> int:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def get_pricing_strategy(niche: str, quality_score: float) -> int:
         """Dynamic pricing based on niche and quality"""
-        base_prices = {
-            "Business & Marketing": 35,
-            "E-commerce & Sales": 45,
-            "Programming & Development": 50,
-            "Content Creation & Copywriting": 25,
-            "Personal Productivity": 20
-        }
-        
-        base_price = base_prices.get(niche, 30)
+        base_price = _BASE_PRICES.get(niche, 30)
         quality_multiplier = 1 + (quality_score - 0.5)  # 0.5-1.5x multiplier
         
-        return int(base_price * quality_multiplier)
\ No newline at end of file
+        return int(base_price * quality_multiplier)
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Shared configuration instance"""
+    return Config()
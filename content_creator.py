@@ -3,194 +3,71 @@
 Content Creation Engine for Marketing Materials
 """
 
+import httpx
 import openai
+import orjson
 import asyncio
-from typing import List, Dict
+import hashlib
+import time
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, Final, List, Mapping, Optional, Tuple
 import logging
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
 from datetime import datetime
-import json
+from functools import lru_cache, partial
 
 logger = logging.getLogger(__name__)
 
-class ContentCreator:
-    """AI-powered marketing content creation"""
-    
-    def __init__(self, config):
-        self.config = config
-        self.openai_client = None
-        
-    async def initialize(self):
-        """Initialize content creation system"""
-        if self.config.OPENAI_API_KEY:
-            self.openai_client = openai.AsyncOpenAI(api_key=self.config.OPENAI_API_KEY)
-            logger.info("✅ Content Creator initialized")
-        else:
-            logger.warning("⚠️ OpenAI API key not found - using templates")
-    
-    async def create_campaign_content(self, prompts: List[Dict]) -> Dict:
-        """Create comprehensive marketing campaign content"""
-        logger.info(f"📝 Creating marketing content for {len(prompts)} products...")
-        
-        campaign_content = {
-            "social_media_posts": await self.create_social_media_content(prompts),
-            "email_sequences": await self.create_email_marketing(prompts),
-            "blog_content": await self.create_blog_content(prompts),
-            "ad_copy": await self.create_ad_copy(prompts),
-            "press_releases": await self.create_press_releases(prompts)
-        }
-        
-        logger.info("✅ Marketing campaign content created")
-        return campaign_content
-    
-    async def create_social_media_content(self, prompts: List[Dict]) -> List[Dict]:
-        """Generate social media posts for products"""
-        social_posts = []
-        
-        for prompt in prompts[:5]:  # Limit to top 5 products
-            posts = await self.generate_social_posts(prompt)
-            social_posts.extend(posts)
-        
-        return social_posts
-    
-    async def generate_social_posts(self, prompt: Dict) -> List[Dict]:
-        """Generate social media posts for a single product"""
-        platforms = ['twitter', 'linkedin', 'facebook', 'instagram']
-        posts = []
-        
-        for platform in platforms:
-            try:
-                post_content = await self.create_platform_post(prompt, platform)
-                posts.append({
-                    'platform': platform,
-                    'content': post_content,
-                    'hashtags': self.generate_hashtags(prompt, platform),
-                    'product_title': prompt['title'],
-                    'niche': prompt['niche']
-                })
-            except Exception as e:
-                logger.error(f"❌ Failed to create {platform} post: {str(e)}")
-                # Fallback to template
-                posts.append(self.create_template_post(prompt, platform))
-        
-        return posts
-    
-    async def create_platform_post(self, prompt: Dict, platform: str) -> str:
-        """Create platform-specific social media post"""
-        
-        platform_specs = {
-            'twitter': {'max_chars': 280, 'style': 'concise and engaging'},
-            'linkedin': {'max_chars': 1300, 'style': 'professional and informative'},
-            'facebook': {'max_chars': 500, 'style': 'conversational and relatable'},
-            'instagram': {'max_chars': 300, 'style': 'visual and inspiring'}
-        }
-        
-        spec = platform_specs[platform]
-        
-        generation_prompt = f"""
-        Create a {platform} post promoting an AI prompt product.
-        
-        Product: {prompt['title']}
-        Niche: {prompt['niche']}
-        Keywords: {', '.join(prompt['keywords'])}
-        
-        Requirements:
-        - Max {spec['max_chars']} characters
-        - {spec['style']} tone
-        - Include call-to-action
-        - Highlight benefits and value
-        - Make it shareable and engaging
-        
-        Generate only the post content.
-        """
-        
-        if self.openai_client:
-            try:
-                response = await self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": f"You are an expert social media marketer creating {platform} content."},
-                        {"role": "user", "content": generation_prompt}
-                    ],
-                    max_tokens=200,
-                    temperature=0.8
-                )
-                return response.choices[0].message.content.strip()
-            except Exception as e:
-                logger.error(f"❌ OpenAI failed for {platform} post: {str(e)}")
-        
-        # Fallback template
-        return self.create_template_post(prompt, platform)['content']
-    
-    def create_template_post(self, prompt: Dict, platform: str) -> Dict:
-        """Create template-based social media post"""
-        templates = {
-            'twitter': f"🤖 New AI prompt for {prompt['niche']}! \n\n{prompt['title']} \n\nGet instant professional results with this proven prompt template. \n\n💡 Perfect for: {prompt['keywords'][0]} \n⚡ Instant download \n\n#AI #Prompts #{prompt['niche'].replace(' ', '')} #Productivity",
-            
-            'linkedin': f"🚀 Boost Your {prompt['niche']} Results with AI \n\nIntroducing: {prompt['title']} \n\nThis professional AI prompt helps you: \n✅ Save hours of work \n✅ Get consistent results \n✅ Improve quality output \n\nPerfect for professionals working with {', '.join(prompt['keywords'][:3])} \n\nReady to 10x your productivity? Get instant access now! \n\n#ArtificialIntelligence #Productivity #Business #Automation",
-            
-            'facebook': f"🔥 Game-changing AI prompt for {prompt['niche']} professionals! \n\n{prompt['title']} \n\nStop struggling with {prompt['keywords'][0]} - this AI prompt does the heavy lifting for you! \n\n✨ Professional results in minutes \n💰 Save time and money \n🎯 Proven to work \n\nWho else needs this? Tag someone who works in {prompt['niche']}! 👇",
-            
-            'instagram': f"✨ {prompt['title']} \n\n🤖 AI-powered {prompt['niche']} solution \n💡 Professional results instantly \n⚡ Download & use today \n\n#AIPrompts #Productivity #Business #Automation #{prompt['niche'].replace(' ', '')}"
-        }
-        
-        return {
-            'platform': platform,
-            'content': templates.get(platform, templates['twitter']),
-            'hashtags': self.generate_hashtags(prompt, platform),
-            'product_title': prompt['title'],
-            'niche': prompt['niche']
-        }
-    
-    def generate_hashtags(self, prompt: Dict, platform: str) -> List[str]:
-        """Generate relevant hashtags for social media"""
-        base_hashtags = ['AI', 'Prompts', 'Automation', 'Productivity', 'Business']
-        
-        niche_hashtags = {
-            'Business & Marketing': ['Marketing', 'Business', 'Strategy', 'Growth'],
-            'Content Creation & Copywriting': ['Content', 'Copywriting', 'Writing', 'CreativeWriting'],
-            'E-commerce & Sales': ['Ecommerce', 'Sales', 'OnlineBusiness', 'Shopify'],
-            'Programming & Development': ['Coding', 'Programming', 'Development', 'Tech'],
-            'Personal Productivity': ['Productivity', 'TimeManagement', 'Goals', 'Success']
-        }
-        
-        hashtags = base_hashtags + niche_hashtags.get(prompt['niche'], [])
-        
-        # Add keyword-based hashtags
-        for keyword in prompt['keywords'][:2]:
-            hashtag = keyword.replace(' ', '').replace('-', '').title()
-            hashtags.append(hashtag)
-        
-        # Platform-specific hashtag limits
-        limits = {'twitter': 10, 'linkedin': 15, 'facebook': 8, 'instagram': 20}
-        limit = limits.get(platform, 10)
-        
-        return hashtags[:limit]
-    
-    async def create_email_marketing(self, prompts: List[Dict]) -> List[Dict]:
-        """Create email marketing sequences"""
-        email_sequences = []
-        
-        # Welcome sequence
-        welcome_sequence = await self.create_welcome_sequence()
-        email_sequences.append(welcome_sequence)
-        
-        # Product launch emails
-        for prompt in prompts[:3]:  # Top 3 products
-            launch_email = await self.create_product_launch_email(prompt)
-            email_sequences.append(launch_email)
-        
-        # Weekly newsletter
-        newsletter = await self.create_newsletter(prompts)
-        email_sequences.append(newsletter)
-        
-        return email_sequences
-    
-    async def create_welcome_sequence(self) -> Dict:
-        """Create welcome email sequence"""
-        return {
-            'type': 'welcome_sequence',
-            'subject': '🎉 Welcome to Nosyt AI - Your Prompt Empire Starts Here!',
-            'content': f"""
+_PLATFORM_SPECS: Final[Mapping[str, Dict]] = MappingProxyType({
+    'twitter': {'max_chars': 280, 'style': 'concise and engaging', 'max_tokens': 80},
+    'linkedin': {'max_chars': 1300, 'style': 'professional and informative', 'max_tokens': 350},
+    'facebook': {'max_chars': 500, 'style': 'conversational and relatable', 'max_tokens': 150},
+    'instagram': {'max_chars': 300, 'style': 'visual and inspiring', 'max_tokens': 100}
+})
+
+# Static instructions sent byte-for-byte identical on every call so the provider can
+# cache the prompt prefix; only the product details follow in the user message
+_SYSTEM_PREFIX_BY_PLATFORM: Final[Mapping[str, str]] = MappingProxyType({
+    platform: (
+        f"You are an expert social media marketer creating {platform} content.\n"
+        f"Create a {platform} post promoting the AI prompt product described by the user.\n"
+        "\n"
+        "Requirements:\n"
+        f"- Max {spec['max_chars']} characters\n"
+        f"- {spec['style']} tone\n"
+        "- Include call-to-action\n"
+        "- Highlight benefits and value\n"
+        "- Make it shareable and engaging\n"
+        "\n"
+        "Generate only the post content."
+    )
+    for platform, spec in _PLATFORM_SPECS.items()
+})
+
+# JSON-mode variant of the system prefix for one request covering several products
+_BATCH_SYSTEM_PREFIX_BY_PLATFORM: Final[Mapping[str, str]] = MappingProxyType({
+    platform: (
+        prefix + "\n\n"
+        "The user lists several numbered products. Write one post per product and return a JSON "
+        'object of the form {"posts": [{"id": <product number>, "content": "<post>"}]}.'
+    )
+    for platform, prefix in _SYSTEM_PREFIX_BY_PLATFORM.items()
+})
+
+# Fallback post bodies, filled with str.format_map
+_TEMPLATES: Final[Mapping[str, str]] = MappingProxyType({
+    'twitter': "🤖 New AI prompt for {niche}! \n\n{title} \n\nGet instant professional results with this proven prompt template. \n\n💡 Perfect for: {kw0} \n⚡ Instant download \n\n#AI #Prompts #{niche_nospace} #Productivity",
+
+    'linkedin': "🚀 Boost Your {niche} Results with AI \n\nIntroducing: {title} \n\nThis professional AI prompt helps you: \n✅ Save hours of work \n✅ Get consistent results \n✅ Improve quality output \n\nPerfect for professionals working with {kw3} \n\nReady to 10x your productivity? Get instant access now! \n\n#ArtificialIntelligence #Productivity #Business #Automation",
+
+    'facebook': "🔥 Game-changing AI prompt for {niche} professionals! \n\n{title} \n\nStop struggling with {kw0} - this AI prompt does the heavy lifting for you! \n\n✨ Professional results in minutes \n💰 Save time and money \n🎯 Proven to work \n\nWho else needs this? Tag someone who works in {niche}! 👇",
+
+    'instagram': "✨ {title} \n\n🤖 AI-powered {niche} solution \n💡 Professional results instantly \n⚡ Download & use today \n\n#AIPrompts #Productivity #Business #Automation #{niche_nospace}"
+})
+
+# Long-form campaign bodies, filled with str.format_map
+_WELCOME_TMPL: Final[str] = """
 Hi there! 👋
 
 Welcome to Nosyt AI - where we turn artificial intelligence into your personal profit machine!
@@ -218,40 +95,32 @@ Tyson @ Nosyt LLC
 New Mexico
 
 P.S. Keep an eye on your inbox - I'll be sharing my best AI profit secrets with you this week!
-""",
-            'call_to_action': 'Download Free Starter Pack',
-            'sequence_day': 1
-        }
-    
-    async def create_product_launch_email(self, prompt: Dict) -> Dict:
-        """Create product launch email"""
-        return {
-            'type': 'product_launch',
-            'subject': f"🔥 NEW: {prompt['title']} (Limited Time)",
-            'content': f"""
+"""
+
+_LAUNCH_TMPL: Final[str] = """
 BIG NEWS! 🎉
 
-I just released something incredible for {prompt['niche']} professionals...
+I just released something incredible for {niche} professionals...
 
-📦 **{prompt['title']}**
+📦 **{title}**
 
 This AI prompt is already getting amazing results:
 
 ✅ Professional output in under 5 minutes
 ✅ No more writer's block or creative struggles  
 ✅ Proven template that works every time
-✅ Perfect for: {', '.join(prompt['keywords'][:3])}
+✅ Perfect for: {kw3}
 
 🏆 **What makes this special?**
 
-• Quality Score: {prompt['quality_score']:.1f}/1.0 (Top Tier)
-• Template Type: {prompt['template_type']}
+• Quality Score: {quality_score:.1f}/1.0 (Top Tier)
+• Template Type: {template_type}
 • Instant download & lifetime access
 • 30-day money-back guarantee
 
-💰 **Special Launch Price: Just ${self.config.get_pricing_strategy(prompt['niche'], prompt['quality_score'])}**
+💰 **Special Launch Price: Just ${price}**
 
-(Regular price will be ${self.config.get_pricing_strategy(prompt['niche'], prompt['quality_score']) + 20} after this week)
+(Regular price will be ${price_plus_20} after this week)
 
 [GET IT NOW - LIMITED TIME]
 
@@ -260,19 +129,9 @@ Don't miss out - this price won't last!
 Tyson @ Nosyt LLC
 
 P.S. Only 48 hours left at this special price!
-""",
-            'call_to_action': 'Get Limited Time Access',
-            'product_id': prompt.get('id', 'unknown')
-        }
-    
-    async def create_newsletter(self, prompts: List[Dict]) -> Dict:
-        """Create weekly newsletter"""
-        top_niches = list(set([p['niche'] for p in prompts[:5]]))
-        
-        return {
-            'type': 'newsletter',
-            'subject': '📊 This Week in AI Profits + New Releases',
-            'content': f"""
+"""
+
+_NEWSLETTER_TMPL: Final[str] = """
 🤖 **Nosyt AI Weekly Report**
 
 Hey Profit Makers!
@@ -280,18 +139,18 @@ Hey Profit Makers!
 Here's what's happening in the AI prompt world:
 
 📈 **This Week's Numbers:**
-• {len(prompts)} new prompts created
-• Top performing niches: {', '.join(top_niches[:3])}
-• Average quality score: {sum(p['quality_score'] for p in prompts)/len(prompts):.2f}/1.0
+• {count} new prompts created
+• Top performing niches: {top_niches}
+• Average quality score: {avg_quality:.2f}/1.0
 
 🔥 **Trending Niches:**
-{chr(10).join([f'• {niche}' for niche in top_niches[:5]])}
+{trending_niches}
 
 💡 **AI Profit Tip of the Week:**
 Combine multiple prompts from different niches to create unique solutions. For example, mix "Business Strategy" + "Content Creation" prompts for comprehensive marketing campaigns.
 
 🆕 **New This Week:**
-{chr(10).join([f'• {p["title"]}' for p in prompts[:3]])}
+{new_titles}
 
 💰 **Member Spotlight:**
 "I made $847 this week using Nosyt prompts for my consulting business!" - Sarah M., Business Coach
@@ -302,49 +161,25 @@ Keep crushing it!
 Tyson @ Nosyt LLC
 
 P.S. Got a prompt request? Just reply to this email!
-""",
-            'call_to_action': 'Browse New Prompts'
-        }
-    
-    async def create_blog_content(self, prompts: List[Dict]) -> List[Dict]:
-        """Create blog content for SEO and authority building"""
-        blog_posts = []
-        
-        # How-to guides
-        for niche in list(set([p['niche'] for p in prompts]))[:3]:
-            blog_post = await self.create_how_to_guide(niche, prompts)
-            blog_posts.append(blog_post)
-        
-        # Industry trends post
-        trends_post = await self.create_trends_post(prompts)
-        blog_posts.append(trends_post)
-        
-        return blog_posts
-    
-    async def create_how_to_guide(self, niche: str, prompts: List[Dict]) -> Dict:
-        """Create how-to guide for specific niche"""
-        niche_prompts = [p for p in prompts if p['niche'] == niche]
-        
-        return {
-            'type': 'how_to_guide',
-            'title': f'How to Use AI Prompts for {niche}: Complete 2025 Guide',
-            'content': f"""
+"""
+
+_HOW_TO_TMPL: Final[str] = """
 # How to Use AI Prompts for {niche}: Complete 2025 Guide
 
-AI prompts are revolutionizing {niche.lower()} by automating complex tasks and delivering professional results in minutes.
+AI prompts are revolutionizing {niche_lower} by automating complex tasks and delivering professional results in minutes.
 
 ## What Are AI Prompts?
 
-AI prompts are carefully crafted instructions that guide artificial intelligence to produce specific, high-quality outputs for your {niche.lower()} needs.
+AI prompts are carefully crafted instructions that guide artificial intelligence to produce specific, high-quality outputs for your {niche_lower} needs.
 
 ## Top {niche} Use Cases:
 
-{chr(10).join([f'• {p["keywords"][0].title()}' for p in niche_prompts[:5]])}
+{use_cases}
 
 ## Step-by-Step Implementation:
 
 ### 1. Choose the Right Prompt
-Select prompts based on your specific {niche.lower()} goals and current challenges.
+Select prompts based on your specific {niche_lower} goals and current challenges.
 
 ### 2. Customize for Your Needs
 Replace placeholders with your specific information and requirements.
@@ -361,40 +196,29 @@ Run the prompt and adjust based on your results.
 
 ## Recommended Prompts for {niche}:
 
-{chr(10).join([f'• **{p["title"]}** - {p["description"][:100]}...' for p in niche_prompts[:3]])}
+{recommended}
 
 ## Conclusion
 
-AI prompts can transform your {niche.lower()} workflow, saving time while improving quality. Start with proven templates and customize them for your specific needs.
+AI prompts can transform your {niche_lower} workflow, saving time while improving quality. Start with proven templates and customize them for your specific needs.
 
-[GET STARTED WITH {niche.upper()} PROMPTS]
-""",
-            'meta_description': f'Learn how to use AI prompts for {niche.lower()}. Complete guide with examples, best practices, and proven templates for 2025.',
-            'keywords': [niche.lower().replace(' ', '-'), 'ai-prompts', 'automation', 'productivity'],
-            'call_to_action': f'Get {niche} Prompts'
-        }
-    
-    async def create_trends_post(self, prompts: List[Dict]) -> Dict:
-        """Create AI trends blog post"""
-        top_niches = list(set([p['niche'] for p in prompts]))
-        
-        return {
-            'type': 'trends',
-            'title': 'AI Prompt Trends 2025: What\'s Working Now',
-            'content': f"""
+[GET STARTED WITH {niche_upper} PROMPTS]
+"""
+
+_TRENDS_TMPL: Final[str] = """
 # AI Prompt Trends 2025: What's Working Now
 
 The AI prompt marketplace is exploding, and smart entrepreneurs are cashing in. Here's what's trending right now.
 
 ## Top Performing Niches:
 
-{chr(10).join([f'### {i+1}. {niche}' + chr(10) + f'High demand for automation in {niche.lower()} continues to drive sales.' for i, niche in enumerate(top_niches[:5])])}
+{niche_sections}
 
 ## Quality Standards Rising
 
 Our data shows prompts with quality scores above 0.8 are selling 3x better than average.
 
-**Average Quality Score This Month:** {sum(p['quality_score'] for p in prompts)/len(prompts):.2f}/1.0
+**Average Quality Score This Month:** {avg_quality:.2f}/1.0
 
 ## Template Types That Convert:
 
@@ -419,31 +243,573 @@ Our data shows prompts with quality scores above 0.8 are selling 3x better than
 4. Build recurring revenue streams
 
 [EXPLORE TRENDING PROMPTS]
-""",
+"""
+
+_PRESS_RELEASE_TMPL: Final[str] = """
+FOR IMMEDIATE RELEASE
+
+Nosyt LLC Launches Revolutionary AI Prompt Collection for {niche_count} Industries
+
+New Mexico-based company releases {count} professional AI prompts to help businesses automate complex tasks
+
+MONCTON, NB / NEW MEXICO - {date} - Nosyt LLC, a leading provider of AI automation solutions, today announced the launch of its comprehensive AI prompt collection, featuring {count} professionally crafted prompts across {niche_count} key industries.
+
+The new collection addresses the growing demand for AI-powered business automation, offering ready-to-use prompts that deliver professional results in minutes rather than hours.
+
+"We're seeing unprecedented demand for AI automation tools," said Tyson, Founder of Nosyt LLC. "Our prompts have helped thousands of professionals save 10+ hours per week while improving their output quality."
+
+Key features of the new collection include:
+
+• Average quality score of {avg_quality:.2f}/1.0
+• Coverage of high-demand niches including {top_niches}
+• Instant download and lifetime access
+• Professional templates and frameworks
+
+The prompts are available immediately through the WHOP marketplace, with pricing starting at $15.
+
+About Nosyt LLC:
+Based in New Mexico and operated from Moncton, NB, Canada, Nosyt LLC specializes in AI automation solutions for businesses and entrepreneurs. The company is committed to making artificial intelligence accessible and profitable for professionals across all industries.
+
+For more information, visit [website] or contact [email].
+
+###
+"""
+
+_BASE_HASHTAGS: Final[Tuple[str, ...]] = ('AI', 'Prompts', 'Automation', 'Productivity', 'Business')
+
+_NICHE_HASHTAGS: Final[Mapping[str, Tuple[str, ...]]] = MappingProxyType({
+    'Business & Marketing': ('Marketing', 'Business', 'Strategy', 'Growth'),
+    'Content Creation & Copywriting': ('Content', 'Copywriting', 'Writing', 'CreativeWriting'),
+    'E-commerce & Sales': ('Ecommerce', 'Sales', 'OnlineBusiness', 'Shopify'),
+    'Programming & Development': ('Coding', 'Programming', 'Development', 'Tech'),
+    'Personal Productivity': ('Productivity', 'TimeManagement', 'Goals', 'Success')
+})
+
+# Platform-specific hashtag limits
+_HASHTAG_LIMITS: Final[Mapping[str, int]] = MappingProxyType({
+    'twitter': 10, 'linkedin': 15, 'facebook': 8, 'instagram': 20
+})
+
+# Separators dropped when turning a keyword into a hashtag
+_STRIP_TABLE: Final = str.maketrans('', '', ' -_/')
+
+# Generated posts kept for reuse; least recently used entries are evicted past this
+_POST_CACHE_SIZE: Final[int] = 1024
+
+@lru_cache(maxsize=64)
+def _niche_tag(niche: str) -> str:
+    """Niche name as a hashtag"""
+    return niche.replace(' ', '')
+
+@lru_cache(maxsize=512)
+def _kw_tag(keyword: str) -> str:
+    """Keyword as a hashtag"""
+    return keyword.translate(_STRIP_TABLE).title()
+
+@dataclass(frozen=True)
+class _CampaignStats:
+    """Niche and quality aggregates shared by the campaign content builders"""
+    niches: List[str]  # Unique niches in first-seen order
+    niche_to_prompts: Dict[str, List[Dict]]
+    avg_quality: float
+    count: int
+    
+    @classmethod
+    def from_prompts(cls, prompts: List[Dict]) -> "_CampaignStats":
+        """Aggregate the prompts in a single pass"""
+        niche_to_prompts = defaultdict(list)
+        quality_sum = 0.0
+        for prompt in prompts:
+            niche_to_prompts[prompt['niche']].append(prompt)
+            quality_sum += prompt['quality_score']
+        
+        return cls(
+            niches=list(niche_to_prompts),
+            niche_to_prompts=dict(niche_to_prompts),
+            avg_quality=quality_sum / len(prompts) if prompts else 0.0,
+            count=len(prompts)
+        )
+
+class _TokenBucket:
+    """Continuously refilled request and token budgets for the OpenAI rate limits"""
+    
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests_available = float(rpm)
+        self.tokens_available = float(tpm)
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        """Add the budget accrued since the last refill"""
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        self.requests_available = min(self.rpm, self.requests_available + elapsed * self.rpm / 60)
+        self.tokens_available = min(self.tpm, self.tokens_available + elapsed * self.tpm / 60)
+    
+    async def acquire(self, est_tokens: int):
+        """Wait until one request and est_tokens tokens fit in the budget"""
+        est_tokens = min(est_tokens, self.tpm)
+        
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.requests_available >= 1 and self.tokens_available >= est_tokens:
+                    self.requests_available -= 1
+                    self.tokens_available -= est_tokens
+                    return
+                
+                wait_s = max(
+                    (1 - self.requests_available) * 60 / self.rpm,
+                    (est_tokens - self.tokens_available) * 60 / self.tpm
+                )
+                await asyncio.sleep(wait_s)
+
+class ContentCreator:
+    """AI-powered marketing content creation"""
+    
+    def __init__(self, config):
+        self.config = config
+        self.openai_client = None
+        self._sem = None
+        self._bucket = None
+        self._post_cache: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self._llm_enabled = False
+        
+    async def initialize(self):
+        """Initialize content creation system"""
+        self._sem = asyncio.Semaphore(self.config.OPENAI_MAX_CONCURRENCY or 8)
+        self._bucket = _TokenBucket(self.config.OPENAI_RPM, self.config.OPENAI_TPM)
+        
+        if self.config.OPENAI_API_KEY:
+            # One pooled HTTP/2 client so concurrent requests share connections
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.config.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=self.config.OPENAI_MAX_CONNECTIONS // 2
+                ),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+                http2=True
+            )
+            self.openai_client = openai.AsyncOpenAI(api_key=self.config.OPENAI_API_KEY, http_client=http_client)
+            logger.info("✅ Content Creator initialized")
+        else:
+            logger.warning("⚠️ OpenAI API key not found - using templates")
+        
+        self._llm_enabled = bool(self.openai_client)
+    
+    async def aclose(self):
+        """Close the OpenAI client and its connection pool"""
+        if self.openai_client:
+            await self.openai_client.close()
+            self.openai_client = None
+            self._llm_enabled = False
+    
+    async def create_campaign_content(self, prompts: List[Dict]) -> Dict:
+        """Create comprehensive marketing campaign content"""
+        logger.info(f"📝 Creating marketing content for {len(prompts)} products...")
+        
+        stats = _CampaignStats.from_prompts(prompts)
+        
+        # Social posts are the only LLM-backed group; the multi-KB long-form templates are
+        # expanded in a worker thread meanwhile. Without a client everything is a plain template
+        if self._llm_enabled:
+            social_posts, (email_sequences, blog_content, press_releases) = await asyncio.gather(
+                self.create_social_media_content(prompts),
+                asyncio.get_running_loop().run_in_executor(None, partial(self._build_long_form, prompts, stats))
+            )
+        else:
+            social_posts = [
+                self.create_template_post(prompt, platform)
+                for prompt in prompts[:5]
+                for platform in _PLATFORM_SPECS
+            ]
+            email_sequences, blog_content, press_releases = self._build_long_form(prompts, stats)
+        
+        campaign_content = {
+            "social_media_posts": social_posts,
+            "email_sequences": email_sequences,
+            "blog_content": blog_content,
+            "ad_copy": self.create_ad_copy(prompts),
+            "press_releases": press_releases
+        }
+        
+        logger.info("✅ Marketing campaign content created")
+        return campaign_content
+    
+    def _build_long_form(self, prompts: List[Dict], stats: _CampaignStats) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """Expand the email, blog and press release templates"""
+        return (
+            self.create_email_marketing(prompts, stats),
+            self.create_blog_content(prompts, stats),
+            self.create_press_releases(prompts, stats)
+        )
+    
+    async def create_social_media_content(self, prompts: List[Dict]) -> List[Dict]:
+        """Generate social media posts for products"""
+        products = prompts[:5]  # Limit to top 5 products
+        
+        if not self.openai_client:
+            posts_per_product = await asyncio.gather(
+                *(self.generate_social_posts(prompt) for prompt in products)
+            )
+            return [post for posts in posts_per_product for post in posts]
+        
+        # One request per platform covering every product
+        contents_per_platform = await asyncio.gather(
+            *(self.create_platform_posts_batched(products, platform) for platform in _PLATFORM_SPECS)
+        )
+        
+        return [
+            self._social_post(prompt, platform, contents[index])
+            for index, prompt in enumerate(products)
+            for platform, contents in zip(_PLATFORM_SPECS, contents_per_platform)
+        ]
+    
+    async def generate_social_posts(self, prompt: Dict) -> List[Dict]:
+        """Generate social media posts for a single product"""
+        platforms = ['twitter', 'linkedin', 'facebook', 'instagram']
+        posts = []
+        
+        contents = await asyncio.gather(
+            *(self.create_platform_post(prompt, platform) for platform in platforms),
+            return_exceptions=True
+        )
+        
+        for platform, post_content in zip(platforms, contents):
+            if isinstance(post_content, Exception):
+                logger.error(f"❌ Failed to create {platform} post: {str(post_content)}")
+                # Fallback to template
+                posts.append(self.create_template_post(prompt, platform))
+                continue
+            
+            posts.append(self._social_post(prompt, platform, post_content))
+        
+        return posts
+    
+    def _social_post(self, prompt: Dict, platform: str, content: str) -> Dict:
+        """Assemble a social media post record"""
+        return {
+            'platform': platform,
+            'content': content,
+            'hashtags': self.generate_hashtags(prompt, platform),
+            'product_title': prompt['title'],
+            'niche': prompt['niche']
+        }
+    
+    async def create_platform_posts_batched(self, prompts: List[Dict], platform: str) -> List[str]:
+        """Create one platform post per product with a single JSON-mode request"""
+        posts: List[Optional[str]] = [None] * len(prompts)
+        misses = []
+        
+        for index, prompt in enumerate(prompts):
+            cache_key = self._post_cache_key(prompt, platform)
+            posts[index] = self._get_cached_post(cache_key, prompt['title'])
+            if posts[index] is None:
+                misses.append(index)
+        
+        if misses:
+            products = "\n\n".join(
+                f"{number}. Product: {prompts[index]['title']}\n"
+                f"Niche: {prompts[index]['niche']}\n"
+                f"Keywords: {', '.join(prompts[index]['keywords'])}"
+                for number, index in enumerate(misses, 1)
+            )
+            
+            try:
+                response = await self._chat_completion(
+                    model=self._model_for(platform),
+                    messages=[
+                        {"role": "system", "content": _BATCH_SYSTEM_PREFIX_BY_PLATFORM[platform]},
+                        {"role": "user", "content": products}
+                    ],
+                    # Room for each post plus its JSON wrapper
+                    max_tokens=(_PLATFORM_SPECS[platform]['max_tokens'] + 20) * len(misses),
+                    temperature=0.8,
+                    response_format={"type": "json_object"}
+                )
+                generated = {int(post["id"]): post["content"].strip() for post in orjson.loads(response)["posts"]}
+            except Exception as e:
+                logger.error(f"❌ Batched {platform} posts failed: {str(e)}")
+                generated = {}
+            
+            max_chars = _PLATFORM_SPECS[platform]['max_chars']
+            for number, index in enumerate(misses, 1):
+                content = generated.get(number)
+                if content and len(content) <= max_chars:
+                    prompt = prompts[index]
+                    self._cache_post(self._post_cache_key(prompt, platform), prompt['title'], content)
+                    posts[index] = content
+        
+        # Missing or overlong posts are regenerated one at a time
+        retry = [index for index, post in enumerate(posts) if post is None]
+        if retry:
+            retried = await asyncio.gather(*(self.create_platform_post(prompts[index], platform) for index in retry))
+            for index, content in zip(retry, retried):
+                posts[index] = content
+        
+        return posts
+    
+    async def create_platform_post(self, prompt: Dict, platform: str) -> str:
+        """Create platform-specific social media post"""
+        
+        generation_prompt = (
+            f"Product: {prompt['title']}\n"
+            f"Niche: {prompt['niche']}\n"
+            f"Keywords: {', '.join(prompt['keywords'])}"
+        )
+        
+        if self.openai_client:
+            cache_key = self._post_cache_key(prompt, platform)
+            cached = self._get_cached_post(cache_key, prompt['title'])
+            if cached is not None:
+                return cached
+            
+            try:
+                content = await self._chat_completion(
+                    model=self._model_for(platform),
+                    messages=[
+                        {"role": "system", "content": _SYSTEM_PREFIX_BY_PLATFORM[platform]},
+                        {"role": "user", "content": generation_prompt}
+                    ],
+                    max_tokens=_PLATFORM_SPECS[platform]['max_tokens'],
+                    temperature=0.8
+                )
+                self._cache_post(cache_key, prompt['title'], content)
+                return content
+            except Exception as e:
+                logger.error(f"❌ OpenAI failed for {platform} post: {str(e)}")
+        
+        # Fallback template
+        return self.create_template_post(prompt, platform)['content']
+    
+    def _model_for(self, kind: str) -> str:
+        """Model routed to a content type"""
+        routing = self.config.MODEL_ROUTING
+        return routing.get(kind, routing["default"])
+    
+    @staticmethod
+    def _post_cache_key(prompt: Dict, platform: str) -> str:
+        """Cache key shared by posts for the same platform, niche and keyword set"""
+        raw = f"{platform}|{prompt['niche']}|{','.join(sorted(prompt['keywords']))}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    
+    def _get_cached_post(self, key: str, title: str) -> Optional[str]:
+        """Return a cached post with its product title swapped for this one, if within the TTL"""
+        entry = self._post_cache.get(key)
+        if entry is None:
+            return None
+        
+        cached_at, cached_title, content = entry
+        if time.monotonic() - cached_at > self.config.CONTENT_CACHE_TTL:
+            del self._post_cache[key]
+            return None
+        
+        self._post_cache.move_to_end(key)
+        return content.replace(cached_title, title)
+    
+    def _cache_post(self, key: str, title: str, content: str):
+        """Remember a generated post, evicting the least recently used one past _POST_CACHE_SIZE"""
+        self._post_cache[key] = (time.monotonic(), title, content)
+        self._post_cache.move_to_end(key)
+        if len(self._post_cache) > _POST_CACHE_SIZE:
+            self._post_cache.popitem(last=False)
+    
+    async def _create_completion(self, request: Dict):
+        """Rate-limited completions.create call, retried with exponential backoff on rate limits and connection errors"""
+        est_tokens = sum(len(m["content"]) for m in request["messages"]) // 4 + request.get("max_tokens", 0)
+        
+        for attempt in range(self.config.MAX_RETRIES + 1):
+            try:
+                await self._bucket.acquire(est_tokens)
+                return await self.openai_client.chat.completions.create(**request)
+            except (openai.RateLimitError, openai.APIConnectionError) as e:
+                if attempt == self.config.MAX_RETRIES:
+                    raise
+                delay = 2 ** attempt
+                logger.warning(f"⏳ OpenAI request failed ({type(e).__name__}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+    
+    async def stream_chat_completion(self, **request) -> AsyncIterator[str]:
+        """Yield the content deltas of a streamed chat completion as they arrive"""
+        async with self._sem:
+            stream = await self._create_completion({**request, "stream": True})
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+    
+    async def _chat_completion(self, **request) -> str:
+        """Chat completion text, streamed unless OPENAI_STREAM is disabled"""
+        if self.config.OPENAI_STREAM:
+            parts = [delta async for delta in self.stream_chat_completion(**request)]
+            return "".join(parts).strip()
+        
+        async with self._sem:
+            response = await self._create_completion(request)
+        return response.choices[0].message.content.strip()
+    
+    def create_template_post(self, prompt: Dict, platform: str) -> Dict:
+        """Create template-based social media post"""
+        ctx = {
+            'niche': prompt['niche'],
+            'title': prompt['title'],
+            'kw0': prompt['keywords'][0],
+            'kw3': ', '.join(prompt['keywords'][:3]),
+            'niche_nospace': _niche_tag(prompt['niche'])
+        }
+        template = _TEMPLATES.get(platform, _TEMPLATES['twitter'])
+        
+        return {
+            'platform': platform,
+            'content': template.format_map(ctx),
+            'hashtags': self.generate_hashtags(prompt, platform),
+            'product_title': prompt['title'],
+            'niche': prompt['niche']
+        }
+    
+    def generate_hashtags(self, prompt: Dict, platform: str) -> List[str]:
+        """Generate relevant hashtags for social media"""
+        # Base, niche and keyword-based hashtags, cut to the platform-specific limit
+        hashtags = (
+            _BASE_HASHTAGS
+            + _NICHE_HASHTAGS.get(prompt['niche'], ())
+            + tuple(_kw_tag(keyword) for keyword in prompt['keywords'][:2])
+        )
+        
+        return list(hashtags[:_HASHTAG_LIMITS.get(platform, 10)])
+    
+    def create_email_marketing(self, prompts: List[Dict], stats: Optional[_CampaignStats] = None) -> List[Dict]:
+        """Create email marketing sequences"""
+        stats = stats or _CampaignStats.from_prompts(prompts)
+        
+        # Welcome sequence, product launch emails for the top 3 products, weekly newsletter
+        return [
+            self.create_welcome_sequence(),
+            *(self.create_product_launch_email(prompt) for prompt in prompts[:3]),
+            self.create_newsletter(prompts, stats)
+        ]
+    
+    def create_welcome_sequence(self) -> Dict:
+        """Create welcome email sequence"""
+        return {
+            'type': 'welcome_sequence',
+            'subject': '🎉 Welcome to Nosyt AI - Your Prompt Empire Starts Here!',
+            'content': _WELCOME_TMPL,
+            'call_to_action': 'Download Free Starter Pack',
+            'sequence_day': 1
+        }
+    
+    def create_product_launch_email(self, prompt: Dict) -> Dict:
+        """Create product launch email"""
+        price = self.config.get_pricing_strategy(prompt['niche'], prompt['quality_score'])
+        ctx = {
+            'niche': prompt['niche'],
+            'title': prompt['title'],
+            'kw3': ', '.join(prompt['keywords'][:3]),
+            'quality_score': prompt['quality_score'],
+            'template_type': prompt['template_type'],
+            'price': price,
+            'price_plus_20': price + 20
+        }
+        
+        return {
+            'type': 'product_launch',
+            'subject': f"🔥 NEW: {prompt['title']} (Limited Time)",
+            'content': _LAUNCH_TMPL.format_map(ctx),
+            'call_to_action': 'Get Limited Time Access',
+            'product_id': prompt.get('id', 'unknown')
+        }
+    
+    def create_newsletter(self, prompts: List[Dict], stats: Optional[_CampaignStats] = None) -> Dict:
+        """Create weekly newsletter"""
+        stats = stats or _CampaignStats.from_prompts(prompts)
+        top_niches = list(dict.fromkeys(p['niche'] for p in prompts[:5]))
+        
+        ctx = {
+            'count': stats.count,
+            'top_niches': ', '.join(top_niches[:3]),
+            'avg_quality': stats.avg_quality,
+            'trending_niches': "\n".join(f'• {niche}' for niche in top_niches[:5]),
+            'new_titles': "\n".join(f'• {p["title"]}' for p in prompts[:3])
+        }
+        
+        return {
+            'type': 'newsletter',
+            'subject': '📊 This Week in AI Profits + New Releases',
+            'content': _NEWSLETTER_TMPL.format_map(ctx),
+            'call_to_action': 'Browse New Prompts'
+        }
+    
+    def create_blog_content(self, prompts: List[Dict], stats: Optional[_CampaignStats] = None) -> List[Dict]:
+        """Create blog content for SEO and authority building"""
+        stats = stats or _CampaignStats.from_prompts(prompts)
+        
+        # How-to guides and the industry trends post
+        return [
+            *(self.create_how_to_guide(niche, prompts, stats) for niche in stats.niches[:3]),
+            self.create_trends_post(prompts, stats)
+        ]
+    
+    def create_how_to_guide(self, niche: str, prompts: List[Dict], stats: Optional[_CampaignStats] = None) -> Dict:
+        """Create how-to guide for specific niche"""
+        stats = stats or _CampaignStats.from_prompts(prompts)
+        niche_prompts = stats.niche_to_prompts.get(niche, [])
+        
+        ctx = {
+            'niche': niche,
+            'niche_lower': niche.lower(),
+            'niche_upper': niche.upper(),
+            'use_cases': "\n".join(f'• {p["keywords"][0].title()}' for p in niche_prompts[:5]),
+            'recommended': "\n".join(f'• **{p["title"]}** - {p["description"][:100]}...' for p in niche_prompts[:3])
+        }
+        
+        return {
+            'type': 'how_to_guide',
+            'title': f'How to Use AI Prompts for {niche}: Complete 2025 Guide',
+            'content': _HOW_TO_TMPL.format_map(ctx),
+            'meta_description': f'Learn how to use AI prompts for {niche.lower()}. Complete guide with examples, best practices, and proven templates for 2025.',
+            'keywords': [niche.lower().replace(' ', '-'), 'ai-prompts', 'automation', 'productivity'],
+            'call_to_action': f'Get {niche} Prompts'
+        }
+    
+    def create_trends_post(self, prompts: List[Dict], stats: Optional[_CampaignStats] = None) -> Dict:
+        """Create AI trends blog post"""
+        stats = stats or _CampaignStats.from_prompts(prompts)
+        top_niches = stats.niches
+        
+        lines = []
+        for i, niche in enumerate(top_niches[:5], 1):
+            lines.append(f'### {i}. {niche}')
+            lines.append(f'High demand for automation in {niche.lower()} continues to drive sales.')
+        
+        ctx = {
+            'niche_sections': "\n".join(lines),
+            'avg_quality': stats.avg_quality
+        }
+        
+        return {
+            'type': 'trends',
+            'title': 'AI Prompt Trends 2025: What\'s Working Now',
+            'content': _TRENDS_TMPL.format_map(ctx),
             'meta_description': 'Discover the hottest AI prompt trends for 2025. Market insights, performance data, and predictions for smart entrepreneurs.',
             'keywords': ['ai-prompt-trends', 'digital-products-2025', 'ai-automation', 'online-business'],
             'call_to_action': 'Explore Trending Prompts'
         }
     
-    async def create_ad_copy(self, prompts: List[Dict]) -> List[Dict]:
+    def create_ad_copy(self, prompts: List[Dict]) -> List[Dict]:
         """Create paid advertising copy"""
-        ad_campaigns = []
-        
-        # Google Ads
-        google_ads = await self.create_google_ads(prompts[:3])
-        ad_campaigns.extend(google_ads)
-        
-        # Facebook Ads  
-        facebook_ads = await self.create_facebook_ads(prompts[:3])
-        ad_campaigns.extend(facebook_ads)
-        
-        return ad_campaigns
+        # Google Ads and Facebook Ads
+        return self.create_google_ads(prompts[:3]) + self.create_facebook_ads(prompts[:3])
     
-    async def create_google_ads(self, prompts: List[Dict]) -> List[Dict]:
+    def create_google_ads(self, prompts: List[Dict]) -> List[Dict]:
         """Create Google Ads copy"""
         ads = []
         
         for prompt in prompts:
+            price = self.config.get_pricing_strategy(prompt['niche'], prompt['quality_score'])
             ad = {
                 'platform': 'google_ads',
                 'product_title': prompt['title'],
@@ -451,7 +817,7 @@ Our data shows prompts with quality scores above 0.8 are selling 3x better than
                     f"{prompt['title']}",
                     f"Professional {prompt['niche']} AI Prompt",
                     f"Get Results in Minutes with AI",
-                    f"${self.config.get_pricing_strategy(prompt['niche'], prompt['quality_score'])} - Instant Download"
+                    f"${price} - Instant Download"
                 ],
                 'descriptions': [
                     f"Professional AI prompt for {prompt['niche']}. Quality score {prompt['quality_score']:.1f}/1.0. Instant download.",
@@ -464,17 +830,18 @@ Our data shows prompts with quality scores above 0.8 are selling 3x better than
         
         return ads
     
-    async def create_facebook_ads(self, prompts: List[Dict]) -> List[Dict]:
+    def create_facebook_ads(self, prompts: List[Dict]) -> List[Dict]:
         """Create Facebook Ads copy"""
         ads = []
         
         for prompt in prompts:
+            price = self.config.get_pricing_strategy(prompt['niche'], prompt['quality_score'])
             ad = {
                 'platform': 'facebook_ads',
                 'product_title': prompt['title'],
                 'primary_text': f"🤖 Stop struggling with {prompt['keywords'][0]}! This AI prompt delivers professional {prompt['niche'].lower()} results in minutes. Quality score: {prompt['quality_score']:.1f}/1.0 ⭐",
                 'headline': f"{prompt['title']}",
-                'description': f"Professional AI prompt - ${self.config.get_pricing_strategy(prompt['niche'], prompt['quality_score'])} - Instant download",
+                'description': f"Professional AI prompt - ${price} - Instant download",
                 'call_to_action': 'Learn More',
                 'target_interests': prompt['keywords'] + ['artificial intelligence', 'business automation', 'productivity tools']
             }
@@ -482,43 +849,25 @@ Our data shows prompts with quality scores above 0.8 are selling 3x better than
         
         return ads
     
-    async def create_press_releases(self, prompts: List[Dict]) -> List[Dict]:
+    def create_press_releases(self, prompts: List[Dict], stats: Optional[_CampaignStats] = None) -> List[Dict]:
         """Create press releases for major product launches"""
         if len(prompts) < 10:  # Only create PR for significant launches
             return []
         
+        stats = stats or _CampaignStats.from_prompts(prompts)
+        
+        ctx = {
+            'niche_count': len(stats.niches),
+            'count': len(prompts),
+            'date': datetime.now().strftime('%B %d, %Y'),
+            'avg_quality': stats.avg_quality,
+            'top_niches': ', '.join(stats.niches[:3])
+        }
+        
         press_release = {
             'type': 'press_release',
-            'title': f'Nosyt LLC Launches Revolutionary AI Prompt Collection for {len(set([p["niche"] for p in prompts]))} Industries',
-            'content': f"""
-FOR IMMEDIATE RELEASE
-
-Nosyt LLC Launches Revolutionary AI Prompt Collection for {len(set([p["niche"] for p in prompts]))} Industries
-
-New Mexico-based company releases {len(prompts)} professional AI prompts to help businesses automate complex tasks
-
-MONCTON, NB / NEW MEXICO - {datetime.now().strftime('%B %d, %Y')} - Nosyt LLC, a leading provider of AI automation solutions, today announced the launch of its comprehensive AI prompt collection, featuring {len(prompts)} professionally crafted prompts across {len(set([p["niche"] for p in prompts]))} key industries.
-
-The new collection addresses the growing demand for AI-powered business automation, offering ready-to-use prompts that deliver professional results in minutes rather than hours.
-
-"We're seeing unprecedented demand for AI automation tools," said Tyson, Founder of Nosyt LLC. "Our prompts have helped thousands of professionals save 10+ hours per week while improving their output quality."
-
-Key features of the new collection include:
-
-• Average quality score of {sum(p['quality_score'] for p in prompts)/len(prompts):.2f}/1.0
-• Coverage of high-demand niches including {', '.join(list(set([p['niche'] for p in prompts]))[:3])}
-• Instant download and lifetime access
-• Professional templates and frameworks
-
-The prompts are available immediately through the WHOP marketplace, with pricing starting at $15.
-
-About Nosyt LLC:
-Based in New Mexico and operated from Moncton, NB, Canada, Nosyt LLC specializes in AI automation solutions for businesses and entrepreneurs. The company is committed to making artificial intelligence accessible and profitable for professionals across all industries.
-
-For more information, visit [website] or contact [email].
-
-###
-"""
+            'title': f'Nosyt LLC Launches Revolutionary AI Prompt Collection for {len(stats.niches)} Industries',
+            'content': _PRESS_RELEASE_TMPL.format_map(ctx)
         }
         
         return [press_release]
\ No newline at end of file
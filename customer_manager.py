@@ -3,17 +3,239 @@
 Customer Management and Support System
 """
 
+import aiosqlite
+import aiosmtplib
 import sqlite3
 import asyncio
-from datetime import datetime
-from typing import Dict, List, Optional
+import time
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, Final, List, Mapping, Optional, Set, Tuple
 import logging
-import smtplib
-from email.mime.text import MimeText
-from email.mime.multipart import MimeMultipart
+from contextlib import asynccontextmanager
+from email import policy
+from email.headerregistry import Address
+from email.message import EmailMessage
 
 logger = logging.getLogger(__name__)
 
+def _now() -> str:
+    """Current local time as the TIMESTAMP text sqlite3's datetime adapter would store"""
+    return datetime.now().isoformat(" ")
+
+def _to_header(to_email: str) -> bytes:
+    """Folded To header for one recipient; ValueError unless the address is a single valid addr-spec"""
+    if not to_email or "\r" in to_email or "\n" in to_email:
+        raise ValueError("address is empty or contains CR/LF")
+    return policy.SMTP.fold_binary("To", str(Address(addr_spec=to_email)))
+
+# Recipient queries for send_marketing_campaign; "new" binds the registration cutoff date,
+# "niche" (requested as "niche:<name>") binds the niche name
+_SEGMENT_SQL: Final[Mapping[str, str]] = MappingProxyType({
+    "vip": "SELECT email FROM customers WHERE total_purchases >= 5",
+    "regular": "SELECT email FROM customers WHERE total_purchases BETWEEN 2 AND 4",
+    "new": "SELECT email FROM customers WHERE registration_date >= ?",
+    "niche": """
+        SELECT c.email FROM customer_niches n
+        JOIN customers c ON c.id = n.customer_id
+        WHERE n.niche = ? AND c.status = 'active'
+    """,
+    "all": "SELECT email FROM customers WHERE status = 'active'"
+})
+
+# Tables and indexes created by create_tables; all present means the schema is current
+_SCHEMA_OBJECTS: Final[Tuple[str, ...]] = (
+    "customers", "customer_purchases", "support_tickets", "email_campaigns", "customer_niches",
+    "idx_customers_status", "idx_customers_purchases", "idx_customers_spent",
+    "idx_customers_regdate", "idx_purchases_customer", "idx_tickets_customer", "idx_niche_customer",
+    "idx_customers_segment"
+)
+
+_SQL_SCHEMA_COUNT = f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({','.join('?' * len(_SCHEMA_OBJECTS))})"
+
+# Hot-path statements live at module level so every call hands sqlite3 the identical
+# string and reuses its compiled statement from the connection's statement cache
+_SQL_INSERT_CUSTOMER = """
+    INSERT OR IGNORE INTO customers (email, first_name, last_name, registration_date, last_activity)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+# Only a freshly inserted row carries this call's timestamp as its registration_date
+_SQL_UPSERT_CUSTOMER = """
+    INSERT INTO customers (email, first_name, last_name, registration_date, last_activity)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(email) DO UPDATE SET last_activity = excluded.last_activity
+    RETURNING id, registration_date = ?
+"""
+
+_SQL_CUSTOMER_ID = "SELECT id FROM customers WHERE email = ?"
+
+_SQL_INSERT_PURCHASE = """
+    INSERT INTO customer_purchases (customer_id, product_id, purchase_date, amount)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_UPDATE_TOTALS = """
+    UPDATE customers 
+    SET total_purchases = total_purchases + ?,
+        total_spent = total_spent + ?,
+        last_activity = ?
+    WHERE id = ?
+"""
+
+_SQL_INSERT_NICHE = "INSERT OR IGNORE INTO customer_niches (customer_id, niche) VALUES (?, ?)"
+
+_SQL_INSERT_TICKET = """
+    INSERT INTO support_tickets (customer_id, subject, message, created_at)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_INSERT_CAMPAIGN = """
+    INSERT INTO email_campaigns (campaign_name, subject, content, sent_at, recipients_count)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_SQL_UPDATE_CAMPAIGN_COUNT = "UPDATE email_campaigns SET recipients_count = ? WHERE id = ?"
+
+_SQL_CUSTOMER_BY_EMAIL = """
+    SELECT id, email, first_name, last_name, registration_date, 
+           total_purchases, total_spent, status, last_activity
+    FROM customers WHERE email = ?
+"""
+
+_SQL_CUSTOMER_TOTALS = """
+    SELECT COUNT(*),
+           COUNT(CASE WHEN registration_date >= DATE('now', 'start of month') THEN 1 END),
+           AVG(CASE WHEN total_spent > 0 THEN total_spent END),
+           MAX(total_spent)
+    FROM customers
+"""
+
+_SQL_TOP_CUSTOMERS = """
+    SELECT email, first_name, last_name, total_purchases, total_spent
+    FROM customers
+    ORDER BY total_spent DESC
+    LIMIT 10
+"""
+
+# Purchase-frequency segment; idx_customers_segment indexes this exact expression so the
+# histogram below is an ordered index scan instead of a table scan plus temp B-tree
+_SEGMENT_EXPR = """
+    CASE 
+        WHEN total_purchases = 1 THEN 'One-time'
+        WHEN total_purchases BETWEEN 2 AND 5 THEN 'Regular'
+        ELSE 'VIP'
+    END"""
+
+_SQL_CUSTOMER_SEGMENTS = f"""
+    SELECT {_SEGMENT_EXPR} as segment,
+        COUNT(*) as count
+    FROM customers
+    WHERE total_purchases > 0
+    GROUP BY segment
+"""
+
+# Pending emails before send_email applies backpressure
+_EMAIL_QUEUE_SIZE: Final[int] = 1000
+
+# Emails per IN (...) lookup in record_purchases_bulk
+_BULK_LOOKUP_CHUNK: Final[int] = 500
+
+# Welcome email body; fields: first_name
+_WELCOME_TMPL: Final[str] = """
+Hi {first_name}! 👋
+
+Welcome to the Nosyt AI family! 🤖
+
+You've just joined thousands of smart entrepreneurs who are using AI prompts to:
+
+✨ Save 10+ hours per week
+💰 Generate consistent income
+🚀 Scale their businesses faster
+📈 Get professional results instantly
+
+🎁 **Your Welcome Bonus:**
+• FREE Starter Pack: 10 High-Converting AI Prompts
+• AI Profit Blueprint (usually $97)
+• Access to our exclusive community
+• Daily profit tips and strategies
+
+Ready to start your AI-powered business?
+
+[CLAIM YOUR FREE STARTER PACK]
+
+To your success,
+Tyson @ Nosyt LLC
+New Mexico
+
+P.S. Keep an eye on your inbox - I'll be sharing my best AI profit secrets with you this week!
+
+---
+Nosyt LLC | New Mexico | AI Automation Experts
+"""
+
+# Purchase confirmation body; fields: order_id, amount, order_date
+_PURCHASE_TMPL: Final[str] = """
+Thank you for your purchase! 🎉
+
+Your AI prompt is ready for download:
+
+📦 **Order Details:**
+• Product: AI Prompt #{order_id}
+• Amount: ${amount:.2f}
+• Order Date: {order_date}
+
+📥 **Download Instructions:**
+1. Check your downloads in your WHOP account
+2. Or click the direct download link below
+3. Save the file to your computer
+4. Copy the prompt and paste into ChatGPT/Claude
+
+[DOWNLOAD YOUR PROMPT NOW]
+
+📞 **Need Help?**
+Reply to this email or contact our support team.
+
+💡 **Pro Tip:**
+Join our Discord community to share results and get bonus prompts!
+
+Thanks for choosing Nosyt AI!
+
+Tyson @ Nosyt LLC
+
+---
+Nosyt LLC | Professional AI Solutions
+"""
+
+# Support auto-response body; fields: ticket_id
+_SUPPORT_TMPL: Final[str] = """
+Thanks for contacting Nosyt AI support! 👋
+
+We've received your message and assigned it ticket #{ticket_id}.
+
+⏱️ **Response Time:** Usually within 4-6 hours
+📞 **Priority Support:** Available for VIP customers
+
+**Common Solutions:**
+• Download issues? Check your WHOP account downloads
+• Prompt not working? Make sure you're using the exact text
+• Need customization? We offer custom prompt services
+
+**Helpful Resources:**
+• FAQ: [link]
+• Video Tutorials: [link]
+• Discord Community: [link]
+
+Our team will get back to you soon!
+
+Best regards,
+Nosyt AI Support Team
+
+---
+Ticket ID: #{ticket_id}
+Nosyt LLC | Professional AI Solutions
+"""
+
 class CustomerManager:
     """Comprehensive customer management system"""
     
@@ -21,19 +243,86 @@ class CustomerManager:
         self.config = config
         self.db_path = "nosyt_customers.db"
         self.conn = None
+        self.read_pool_size = 4
+        self._read_pool: Optional[asyncio.Queue] = None
+        self._write_lock = asyncio.Lock()
+        self._analytics_cache: Tuple[float, Optional[Dict]] = (0.0, None)
+        self._email_queue: asyncio.Queue = asyncio.Queue(maxsize=_EMAIL_QUEUE_SIZE)
+        self._email_workers: List[asyncio.Task] = []
+        self._bg_tasks: Set[asyncio.Task] = set()
         
     async def initialize(self):
         """Initialize customer management system"""
-        self.conn = sqlite3.connect(self.db_path)
+        self.conn = await self._connect()
         await self.create_tables()
+        
+        # Readers run lookups and analytics without queueing behind the writer (WAL allows both)
+        self._read_pool = asyncio.Queue(maxsize=self.read_pool_size)
+        for _ in range(self.read_pool_size):
+            self._read_pool.put_nowait(await self._connect(read_only=True))
+        
+        self._email_workers = [
+            asyncio.create_task(self._email_worker()) for _ in range(self.config.EMAIL_WORKERS)
+        ]
         logger.info("✅ Customer management system initialized")
     
+    async def _connect(self, read_only: bool = False) -> aiosqlite.Connection:
+        """Open a tuned connection to the customer database"""
+        # Autocommit connection; multi-statement writes open explicit transactions
+        conn = await aiosqlite.connect(self.db_path, isolation_level=None, cached_statements=256)
+        await conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-64000;
+            PRAGMA mmap_size=268435456;
+            PRAGMA foreign_keys=ON;
+        """)
+        if read_only:
+            await conn.execute("PRAGMA query_only=1")
+        conn.row_factory = aiosqlite.Row
+        return conn
+    
+    @asynccontextmanager
+    async def _read(self):
+        """Borrow a read-only connection from the pool"""
+        conn = await self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put_nowait(conn)
+    
+    async def _fetchone(self, sql: str, params: Tuple = ()):
+        """Run a read-only query on a pooled reader and return the first row"""
+        async with self._read() as conn:
+            async with conn.execute(sql, params) as cursor:
+                return await cursor.fetchone()
+    
+    async def _fetchall(self, sql: str, params: Tuple = ()) -> List:
+        """Run a read-only query on a pooled reader and return all rows"""
+        async with self._read() as conn:
+            async with conn.execute(sql, params) as cursor:
+                return await cursor.fetchall()
+    
+    async def _iter_rows(self, sql: str, params: Tuple = (), batch: int = 1000) -> AsyncIterator[Tuple]:
+        """Stream a read-only query from a pooled reader in fetchmany batches"""
+        async with self._read() as conn:
+            async with conn.execute(sql, params) as cursor:
+                while rows := await cursor.fetchmany(batch):
+                    for row in rows:
+                        yield row
+    
     async def create_tables(self):
         """Create customer database tables"""
-        cursor = self.conn.cursor()
+        # Skip the DDL entirely when every table and index already exists
+        async with self.conn.execute(_SQL_SCHEMA_COUNT, _SCHEMA_OBJECTS) as cursor:
+            if (await cursor.fetchone())[0] == len(_SCHEMA_OBJECTS):
+                return
+        
+        await self.conn.execute("BEGIN IMMEDIATE")
         
         # Customers table
-        cursor.execute("""
+        await self.conn.execute("""
             CREATE TABLE IF NOT EXISTS customers (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 email TEXT UNIQUE,
@@ -43,13 +332,12 @@ class CustomerManager:
                 total_purchases INTEGER DEFAULT 0,
                 total_spent INTEGER DEFAULT 0,
                 status TEXT DEFAULT 'active',
-                preferred_niches TEXT,
                 last_activity TIMESTAMP
             )
         """)
         
         # Customer purchases table
-        cursor.execute("""
+        await self.conn.execute("""
             CREATE TABLE IF NOT EXISTS customer_purchases (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 customer_id INTEGER,
@@ -62,7 +350,7 @@ class CustomerManager:
         """)
         
         # Support tickets table
-        cursor.execute("""
+        await self.conn.execute("""
             CREATE TABLE IF NOT EXISTS support_tickets (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 customer_id INTEGER,
@@ -77,7 +365,7 @@ class CustomerManager:
         """)
         
         # Email campaigns table
-        cursor.execute("""
+        await self.conn.execute("""
             CREATE TABLE IF NOT EXISTS email_campaigns (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 campaign_name TEXT,
@@ -90,168 +378,208 @@ class CustomerManager:
             )
         """)
         
-        self.conn.commit()
+        # Preferred niches, one row per customer/niche pair
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS customer_niches (
+                customer_id INTEGER,
+                niche TEXT,
+                PRIMARY KEY (customer_id, niche),
+                FOREIGN KEY (customer_id) REFERENCES customers (id)
+            ) WITHOUT ROWID
+        """)
+        await self._migrate_preferred_niches()
+        
+        await self.conn.commit()
+        
+        # Indexes for segment filters, analytics ordering and per-customer lookups
+        await self.conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_customers_status ON customers(status) WHERE status = 'active';
+            CREATE INDEX IF NOT EXISTS idx_customers_purchases ON customers(total_purchases);
+            CREATE INDEX IF NOT EXISTS idx_customers_spent ON customers(total_spent);
+            CREATE INDEX IF NOT EXISTS idx_customers_regdate ON customers(registration_date);
+            CREATE INDEX IF NOT EXISTS idx_purchases_customer ON customer_purchases(customer_id, purchase_date);
+            CREATE INDEX IF NOT EXISTS idx_tickets_customer ON support_tickets(customer_id, status);
+            CREATE INDEX IF NOT EXISTS idx_niche_customer ON customer_niches(niche);
+        """)
+        await self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_customers_segment ON customers({_SEGMENT_EXPR}) WHERE total_purchases > 0"
+        )
         logger.info("📁 Customer database tables created")
     
+    async def _migrate_preferred_niches(self):
+        """Move the legacy comma-separated customers.preferred_niches column into customer_niches"""
+        async with self.conn.execute("PRAGMA table_info(customers)") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if "preferred_niches" not in columns:
+            return
+        
+        async with self.conn.execute(
+            "SELECT id, preferred_niches FROM customers WHERE preferred_niches <> ''"
+        ) as cursor:
+            rows = await cursor.fetchall()
+        await self.conn.executemany(_SQL_INSERT_NICHE, [
+            (customer_id, niche.strip())
+            for customer_id, niches in rows
+            for niche in niches.split(",") if niche.strip()
+        ])
+        await self.conn.execute("ALTER TABLE customers DROP COLUMN preferred_niches")
+    
+    async def _upsert_customer(self, email: str, first_name: str = "", last_name: str = "",
+                               now: Optional[str] = None) -> Tuple[int, bool]:
+        """Insert customer or touch last_activity without committing; returns (customer_id, is_new)"""
+        now = now or _now()
+        async with self.conn.execute(_SQL_UPSERT_CUSTOMER, (email, first_name, last_name, now, now, now)) as cursor:
+            customer_id, is_new = await cursor.fetchone()
+        return customer_id, bool(is_new)
+    
     async def add_customer(self, email: str, first_name: str = "", last_name: str = "") -> int:
         """Add new customer to database"""
-        cursor = self.conn.cursor()
+        async with self._write_lock:
+            customer_id, is_new = await self._upsert_customer(email, first_name, last_name)
         
-        try:
-            cursor.execute("""
-                INSERT INTO customers (email, first_name, last_name, registration_date, last_activity)
-                VALUES (?, ?, ?, ?, ?)
-            """, (email, first_name, last_name, datetime.now(), datetime.now()))
-            
-            customer_id = cursor.lastrowid
-            self.conn.commit()
-            
-            logger.info(f"👤 New customer added: {email} (ID: {customer_id})")
-            
-            # Send welcome email
-            await self.send_welcome_email(email, first_name)
-            
+        if not is_new:
+            logger.info(f"👤 Customer already exists: {email} (ID: {customer_id})")
             return customer_id
-            
-        except sqlite3.IntegrityError:
-            # Customer already exists
-            cursor.execute("SELECT id FROM customers WHERE email = ?", (email,))
-            existing_id = cursor.fetchone()[0]
-            logger.info(f"👤 Customer already exists: {email} (ID: {existing_id})")
-            return existing_id
-    
-    async def record_purchase(self, customer_email: str, product_id: str, amount: int):
-        """Record customer purchase"""
-        cursor = self.conn.cursor()
         
-        # Get or create customer
-        customer_id = await self.add_customer(customer_email)
+        self._analytics_cache = (0.0, None)
+        logger.info(f"👤 New customer added: {email} (ID: {customer_id})")
         
-        # Record purchase
-        cursor.execute("""
-            INSERT INTO customer_purchases (customer_id, product_id, purchase_date, amount)
-            VALUES (?, ?, ?, ?)
-        """, (customer_id, product_id, datetime.now(), amount))
-        
-        # Update customer totals
-        cursor.execute("""
-            UPDATE customers 
-            SET total_purchases = total_purchases + 1,
-                total_spent = total_spent + ?,
-                last_activity = ?
-            WHERE id = ?
-        """, (amount, datetime.now(), customer_id))
-        
-        self.conn.commit()
+        # Send welcome email in the background
+        self._fire(self.send_welcome_email(email, first_name))
         
+        return customer_id
+    
+    async def record_purchase(self, customer_email: str, product_id: str, amount: int):
+        """Record customer purchase"""
+        now = _now()
+        
+        # Upsert customer, record purchase and update totals in one transaction
+        async with self._write_lock:
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                customer_id, is_new = await self._upsert_customer(customer_email, now=now)
+                await self.conn.execute(_SQL_INSERT_PURCHASE, (customer_id, product_id, now, amount))
+                
+                await self.conn.execute(_SQL_UPDATE_TOTALS, (1, amount, now, customer_id))
+                
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+        self._analytics_cache = (0.0, None)
+        
+        if is_new:
+            logger.info(f"👤 New customer added: {customer_email} (ID: {customer_id})")
+            self._fire(self.send_welcome_email(customer_email, ""))
         logger.info(f"💰 Purchase recorded: {customer_email} - ${amount/100:.2f}")
         
-        # Send purchase confirmation
-        await self.send_purchase_confirmation(customer_email, product_id, amount)
+        # Send emails off the critical path
+        self._fire(self.send_purchase_confirmation(customer_email, product_id, amount))
+    
+    async def record_purchases_bulk(self, rows: List[Tuple[str, str, int]]) -> int:
+        """Record many (email, product_id, amount) purchases in one transaction"""
+        if not rows:
+            return 0
+        
+        now = _now()
+        emails = list(dict.fromkeys(email for email, _, _ in rows))
+        
+        async with self._write_lock:
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                await self.conn.executemany(_SQL_INSERT_CUSTOMER, [(email, "", "", now, now) for email in emails])
+                
+                # Map emails to ids in chunks below SQLite's bound-parameter limit
+                ids: Dict[str, int] = {}
+                for i in range(0, len(emails), _BULK_LOOKUP_CHUNK):
+                    chunk = emails[i:i + _BULK_LOOKUP_CHUNK]
+                    placeholders = ",".join("?" * len(chunk))
+                    async with self.conn.execute(
+                        f"SELECT id, email FROM customers WHERE email IN ({placeholders})", chunk
+                    ) as cursor:
+                        ids.update({email: customer_id async for customer_id, email in cursor})
+                
+                await self.conn.executemany(
+                    _SQL_INSERT_PURCHASE,
+                    [(ids[email], product_id, now, amount) for email, product_id, amount in rows]
+                )
+                
+                # One totals update per customer rather than per purchase
+                totals: Dict[int, List[int]] = {}
+                for email, _, amount in rows:
+                    agg = totals.setdefault(ids[email], [0, 0])
+                    agg[0] += 1
+                    agg[1] += amount
+                await self.conn.executemany(
+                    _SQL_UPDATE_TOTALS,
+                    [(count, spent, now, customer_id) for customer_id, (count, spent) in totals.items()]
+                )
+                
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+        self._analytics_cache = (0.0, None)
+        
+        logger.info(f"💰 Bulk purchases recorded: {len(rows)} rows for {len(totals)} customers")
+        return len(rows)
+    
+    async def set_preferred_niches(self, customer_id: int, niches: List[str]):
+        """Replace a customer's preferred niches"""
+        async with self._write_lock:
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                await self.conn.execute("DELETE FROM customer_niches WHERE customer_id = ?", (customer_id,))
+                await self.conn.executemany(
+                    _SQL_INSERT_NICHE, [(customer_id, niche) for niche in dict.fromkeys(niches)]
+                )
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
     
     async def get_customer_analytics(self) -> Dict:
         """Get customer analytics data"""
-        cursor = self.conn.cursor()
-        
-        # Total customers
-        cursor.execute("SELECT COUNT(*) FROM customers")
-        total_customers = cursor.fetchone()[0]
-        
-        # New customers this month
-        cursor.execute("""
-            SELECT COUNT(*) FROM customers 
-            WHERE DATE(registration_date) >= DATE('now', 'start of month')
-        """)
-        new_customers_month = cursor.fetchone()[0]
-        
-        # Customer lifetime value
-        cursor.execute("""
-            SELECT AVG(total_spent), MAX(total_spent), MIN(total_spent)
-            FROM customers WHERE total_spent > 0
-        """)
-        ltv_data = cursor.fetchone()
-        avg_ltv = ltv_data[0] / 100 if ltv_data[0] else 0
-        max_ltv = ltv_data[1] / 100 if ltv_data[1] else 0
-        
-        # Top customers
-        cursor.execute("""
-            SELECT email, first_name, last_name, total_purchases, total_spent
-            FROM customers
-            ORDER BY total_spent DESC
-            LIMIT 10
-        """)
-        top_customers = cursor.fetchall()
-        
-        # Purchase frequency
-        cursor.execute("""
-            SELECT 
-                CASE 
-                    WHEN total_purchases = 1 THEN 'One-time'
-                    WHEN total_purchases BETWEEN 2 AND 5 THEN 'Regular'
-                    ELSE 'VIP'
-                END as segment,
-                COUNT(*) as count
-            FROM customers
-            WHERE total_purchases > 0
-            GROUP BY segment
-        """)
-        customer_segments = cursor.fetchall()
-        
-        return {
+        # Reuse the last result until it expires or a customer write invalidates it
+        cached_at, cached = self._analytics_cache
+        if cached is not None and time.monotonic() - cached_at < self.config.CUSTOMER_ANALYTICS_TTL:
+            return cached
+        
+        # Independent aggregates run in parallel on pooled readers
+        totals, top_customers, customer_segments = await asyncio.gather(
+            self._fetchone(_SQL_CUSTOMER_TOTALS),
+            self._fetchall(_SQL_TOP_CUSTOMERS),
+            self._fetchall(_SQL_CUSTOMER_SEGMENTS)
+        )
+        total_customers, new_customers_month, avg_spent, max_spent = totals
+        avg_ltv = avg_spent / 100 if avg_spent else 0
+        max_ltv = max_spent / 100 if max_spent else 0
+        
+        analytics = {
             "total_customers": total_customers,
             "new_customers_month": new_customers_month,
             "avg_customer_ltv": round(avg_ltv, 2),
             "max_customer_ltv": round(max_ltv, 2),
             "top_customers": [
                 {
-                    "email": email,
-                    "name": f"{first_name} {last_name}".strip(),
-                    "purchases": purchases,
-                    "total_spent": spent / 100
+                    "email": row["email"],
+                    "name": f"{row['first_name']} {row['last_name']}".strip(),
+                    "purchases": row["total_purchases"],
+                    "total_spent": row["total_spent"] / 100
                 }
-                for email, first_name, last_name, purchases, spent in top_customers
+                for row in top_customers
             ],
-            "customer_segments": [
-                {"segment": segment, "count": count}
-                for segment, count in customer_segments
-            ]
+            "customer_segments": [dict(row) for row in customer_segments]
         }
+        
+        self._analytics_cache = (time.monotonic(), analytics)
+        return analytics
     
     async def send_welcome_email(self, email: str, first_name: str):
         """Send welcome email to new customer"""
         subject = "🎉 Welcome to Nosyt AI - Your AI Profit Journey Starts Now!"
         
-        content = f"""
-        Hi {first_name or 'there'}! 👋
-        
-        Welcome to the Nosyt AI family! 🤖
-        
-        You've just joined thousands of smart entrepreneurs who are using AI prompts to:
-        
-        ✨ Save 10+ hours per week
-        💰 Generate consistent income  
-        🚀 Scale their businesses faster
-        📈 Get professional results instantly
-        
-        🎁 **Your Welcome Bonus:**
-        • FREE Starter Pack: 10 High-Converting AI Prompts
-        • AI Profit Blueprint (usually $97)
-        • Access to our exclusive community
-        • Daily profit tips and strategies
-        
-        Ready to start your AI-powered business?
-        
-        [CLAIM YOUR FREE STARTER PACK]
-        
-        To your success,
-        Tyson @ Nosyt LLC
-        New Mexico
-        
-        P.S. Keep an eye on your inbox - I'll be sharing my best AI profit secrets with you this week!
-        
-        ---
-        Nosyt LLC | New Mexico | AI Automation Experts
-        """
+        content = _WELCOME_TMPL.format_map({'first_name': first_name or 'there'})
         
         await self.send_email(email, subject, content)
     
@@ -259,75 +587,85 @@ class CustomerManager:
         """Send purchase confirmation email"""
         subject = f"✅ Your AI Prompt is Ready! (Order #{product_id[-8:]})"
         
-        content = f"""
-        Thank you for your purchase! 🎉
-        
-        Your AI prompt is ready for download:
-        
-        📦 **Order Details:**
-        • Product: AI Prompt #{product_id[-8:]}
-        • Amount: ${amount/100:.2f}
-        • Order Date: {datetime.now().strftime('%B %d, %Y')}
-        
-        📥 **Download Instructions:**
-        1. Check your downloads in your WHOP account
-        2. Or click the direct download link below
-        3. Save the file to your computer
-        4. Copy the prompt and paste into ChatGPT/Claude
-        
-        [DOWNLOAD YOUR PROMPT NOW]
-        
-        📞 **Need Help?**
-        Reply to this email or contact our support team.
-        
-        💡 **Pro Tip:**
-        Join our Discord community to share results and get bonus prompts!
-        
-        Thanks for choosing Nosyt AI!
-        
-        Tyson @ Nosyt LLC
-        
-        ---
-        Nosyt LLC | Professional AI Solutions
-        """
+        content = _PURCHASE_TMPL.format_map({
+            'order_id': product_id[-8:],
+            'amount': amount / 100,
+            'order_date': datetime.now().strftime('%B %d, %Y')
+        })
         
         await self.send_email(email, subject, content)
     
+    def _fire(self, coro):
+        """Run an email coroutine in the background, tracked so close() can wait for it"""
+        task = asyncio.create_task(coro)
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+    
     async def send_email(self, to_email: str, subject: str, content: str):
-        """Send email (mock implementation)"""
-        # In a real implementation, you'd use a proper email service like SendGrid, AWS SES, etc.
-        logger.info(f"📧 Email sent to {to_email}: {subject}")
-        
-        # Mock email sending - in production you'd implement actual email sending
-        # Example with Gmail SMTP (requires app password):
-        """
+        """Queue email for the SMTP worker pool"""
+        await self._email_queue.put((to_email, subject, self._render_envelope(subject, content)))
+    
+    def _render_envelope(self, subject: str, content: str) -> bytes:
+        """Serialize headers and body once; workers prepend each recipient's To header"""
+        msg = EmailMessage(policy=policy.SMTP)
+        msg['From'] = self.config.EMAIL_FROM
+        msg['Subject'] = subject
+        msg.set_content(content, cte='quoted-printable')
+        return bytes(msg)
+    
+    async def _smtp_connect(self) -> aiosmtplib.SMTP:
+        """Open an authenticated SMTP session"""
+        smtp = aiosmtplib.SMTP(hostname=self.config.SMTP_HOST, port=int(self.config.SMTP_PORT))
+        await smtp.connect()
+        if self.config.SMTP_USER:
+            await smtp.login(self.config.SMTP_USER, self.config.SMTP_PASS)
+        return smtp
+    
+    async def _email_worker(self):
+        """Drain the send queue over one persistent SMTP session"""
+        smtp: Optional[aiosmtplib.SMTP] = None
         try:
-            msg = MimeMultipart()
-            msg['From'] = "noreply@nosyt.com"
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            msg.attach(MimeText(content, 'plain'))
-            
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
-            server.login("your-email@gmail.com", "your-app-password")
-            text = msg.as_string()
-            server.sendmail("noreply@nosyt.com", to_email, text)
-            server.quit()
-            
-            logger.info(f"✅ Email sent successfully to {to_email}")
-        except Exception as e:
-            logger.error(f"❌ Email sending failed: {str(e)}")
-        """
+            while True:
+                to_email, subject, envelope = await self._email_queue.get()
+                try:
+                    # Stored addresses are untrusted: never splice one into the headers unvalidated
+                    try:
+                        to_header = _to_header(to_email)
+                    except ValueError as e:
+                        logger.error(f"❌ Invalid recipient {to_email!r}, email not sent: {str(e)}")
+                        continue
+                    
+                    if not self.config.SMTP_HOST:
+                        # Mock sending when no SMTP server is configured
+                        logger.info(f"📧 Email sent to {to_email}: {subject}")
+                        continue
+                    
+                    if smtp is None or not smtp.is_connected:
+                        smtp = await self._smtp_connect()
+                    await smtp.sendmail(
+                        self.config.EMAIL_FROM, [to_email], to_header + envelope
+                    )
+                    
+                    logger.info(f"✅ Email sent successfully to {to_email}")
+                except Exception as e:
+                    logger.error(f"❌ Email sending failed: {str(e)}")
+                    # Drop the session; the next message reconnects
+                    if smtp is not None:
+                        smtp.close()
+                        smtp = None
+                finally:
+                    self._email_queue.task_done()
+        finally:
+            if smtp is not None and smtp.is_connected:
+                try:
+                    await smtp.quit()
+                except Exception:
+                    smtp.close()
     
     async def create_support_ticket(self, customer_email: str, subject: str, message: str) -> int:
         """Create customer support ticket"""
-        cursor = self.conn.cursor()
-        
         # Get customer ID
-        cursor.execute("SELECT id FROM customers WHERE email = ?", (customer_email,))
-        result = cursor.fetchone()
+        result = await self._fetchone(_SQL_CUSTOMER_ID, (customer_email,))
         
         if not result:
             customer_id = await self.add_customer(customer_email)
@@ -335,18 +673,17 @@ class CustomerManager:
             customer_id = result[0]
         
         # Create ticket
-        cursor.execute("""
-            INSERT INTO support_tickets (customer_id, subject, message, created_at)
-            VALUES (?, ?, ?, ?)
-        """, (customer_id, subject, message, datetime.now()))
+        async with self._write_lock:
+            cursor = await self.conn.execute(
+                _SQL_INSERT_TICKET, (customer_id, subject, message, _now())
+            )
         
         ticket_id = cursor.lastrowid
-        self.conn.commit()
         
         logger.info(f"🎟️ Support ticket created: #{ticket_id} for {customer_email}")
         
-        # Send auto-response
-        await self.send_support_auto_response(customer_email, ticket_id)
+        # Send auto-response in the background
+        self._fire(self.send_support_auto_response(customer_email, ticket_id))
         
         return ticket_id
     
@@ -354,101 +691,73 @@ class CustomerManager:
         """Send automatic support response"""
         subject = f"🎟️ Support Ticket #{ticket_id} - We're Here to Help!"
         
-        content = f"""
-        Thanks for contacting Nosyt AI support! 👋
-        
-        We've received your message and assigned it ticket #{ticket_id}.
-        
-        ⏱️ **Response Time:** Usually within 4-6 hours
-        📞 **Priority Support:** Available for VIP customers
-        
-        **Common Solutions:**
-        • Download issues? Check your WHOP account downloads
-        • Prompt not working? Make sure you're using the exact text
-        • Need customization? We offer custom prompt services
-        
-        **Helpful Resources:**
-        • FAQ: [link]
-        • Video Tutorials: [link]
-        • Discord Community: [link]
-        
-        Our team will get back to you soon!
-        
-        Best regards,
-        Nosyt AI Support Team
-        
-        ---
-        Ticket ID: #{ticket_id}
-        Nosyt LLC | Professional AI Solutions
-        """
+        content = _SUPPORT_TMPL.format_map({'ticket_id': ticket_id})
         
         await self.send_email(email, subject, content)
     
     async def get_customer_by_email(self, email: str) -> Optional[Dict]:
         """Get customer information by email"""
-        cursor = self.conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, email, first_name, last_name, registration_date, 
-                   total_purchases, total_spent, status, last_activity
-            FROM customers WHERE email = ?
-        """, (email,))
-        
-        result = cursor.fetchone()
+        result = await self._fetchone(_SQL_CUSTOMER_BY_EMAIL, (email,))
         
         if result:
-            return {
-                "id": result[0],
-                "email": result[1],
-                "first_name": result[2],
-                "last_name": result[3],
-                "registration_date": result[4],
-                "total_purchases": result[5],
-                "total_spent": result[6] / 100,
-                "status": result[7],
-                "last_activity": result[8]
-            }
+            customer = dict(result)
+            customer["total_spent"] /= 100
+            return customer
         
         return None
     
     async def send_marketing_campaign(self, campaign_name: str, subject: str, content: str, target_segment: str = "all"):
         """Send marketing email campaign"""
-        cursor = self.conn.cursor()
+        now = datetime.now()
         
         # Get target customers based on segment
-        if target_segment == "vip":
-            cursor.execute("SELECT email FROM customers WHERE total_purchases >= 5")
-        elif target_segment == "regular":
-            cursor.execute("SELECT email FROM customers WHERE total_purchases BETWEEN 2 AND 4")
-        elif target_segment == "new":
-            cursor.execute("""
-                SELECT email FROM customers 
-                WHERE DATE(registration_date) >= DATE('now', '-30 days')
-            """)
-        else:  # all
-            cursor.execute("SELECT email FROM customers WHERE status = 'active'")
-        
-        recipients = cursor.fetchall()
-        recipients_count = len(recipients)
-        
-        # Record campaign
-        cursor.execute("""
-            INSERT INTO email_campaigns (campaign_name, subject, content, sent_at, recipients_count)
-            VALUES (?, ?, ?, ?, ?)
-        """, (campaign_name, subject, content, datetime.now(), recipients_count))
-        
-        self.conn.commit()
-        
-        # Send emails (in production, you'd use a proper email service)
-        for (email,) in recipients:
-            await self.send_email(email, subject, content)
+        segment, _, niche = target_segment.partition(":")
+        sql = _SEGMENT_SQL.get(segment, _SEGMENT_SQL["all"])
+        if segment == "new":
+            params = ((now - timedelta(days=30)).date().isoformat(),)
+        elif segment == "niche":
+            params = (niche,)
+        else:
+            params = ()
+        
+        # Record campaign, then fill in the count once recipients are streamed
+        async with self._write_lock:
+            cursor = await self.conn.execute(
+                _SQL_INSERT_CAMPAIGN, (campaign_name, subject, content, now.isoformat(" "), 0)
+            )
+        campaign_id = cursor.lastrowid
+        
+        # Feed recipients to the SMTP worker pool without materializing the list;
+        # every recipient shares one serialized envelope
+        envelope = self._render_envelope(subject, content)
+        recipients_count = 0
+        async for (email,) in self._iter_rows(sql, params):
+            await self._email_queue.put((email, subject, envelope))
+            recipients_count += 1
+        
+        async with self._write_lock:
+            await self.conn.execute(_SQL_UPDATE_CAMPAIGN_COUNT, (recipients_count, campaign_id))
         
         logger.info(f"📢 Marketing campaign '{campaign_name}' sent to {recipients_count} customers")
         
         return recipients_count
     
     async def close(self):
-        """Close database connection"""
+        """Flush queued emails and close database connections"""
+        # Let background sends reach the queue before draining it
+        if self._bg_tasks:
+            await asyncio.gather(*self._bg_tasks, return_exceptions=True)
+        
+        if self._email_workers:
+            await self._email_queue.join()
+            for worker in self._email_workers:
+                worker.cancel()
+            await asyncio.gather(*self._email_workers, return_exceptions=True)
+            self._email_workers = []
+        
+        if self._read_pool:
+            while not self._read_pool.empty():
+                await self._read_pool.get_nowait().close()
         if self.conn:
-            self.conn.close()
+            await self.conn.close()
             logger.info("📁 Customer database connection closed")
\ No newline at end of file
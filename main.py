@@ -10,7 +10,7 @@ Date: 2025-08-04
 import asyncio
 import logging
 from datetime import datetime
-from config import Config
+from config import get_config
 from prompt_generator import PromptGenerator
 from whop_integration import WhopIntegration
 from content_creator import ContentCreator
@@ -33,12 +33,14 @@ class NosytAutomationSystem:
     """Main automation system orchestrator"""
     
     def __init__(self):
-        self.config = Config()
+        self.config = get_config()
         self.prompt_generator = PromptGenerator(self.config)
         self.whop_integration = WhopIntegration(self.config)
         self.content_creator = ContentCreator(self.config)
-        self.scheduler = AutomationScheduler(self.config)
         self.analytics = AnalyticsTracker(self.config)
+        self.scheduler = AutomationScheduler(self.config, self.analytics)
+        # Held for the whole daily cycle; scheduled and manual runs never overlap
+        self.automation_lock = asyncio.Lock()
         
     async def initialize(self):
         """Initialize all system components"""
@@ -52,8 +54,24 @@ class NosytAutomationSystem:
         
         logger.info("✅ System initialization complete!")
     
+    async def shutdown(self):
+        """Release network clients and database connections"""
+        await self.prompt_generator.aclose()
+        await self.content_creator.aclose()
+        await self.whop_integration.close()
+        await self.analytics.close()
+    
     async def run_daily_automation(self):
         """Run daily automated tasks"""
+        if self.automation_lock.locked():
+            logger.warning("⏳ Daily automation already running, skipping this trigger")
+            return
+        
+        async with self.automation_lock:
+            await self._run_daily_cycle()
+    
+    async def _run_daily_cycle(self):
+        """One generation, marketing, upload and analytics cycle"""
         logger.info("🔄 Starting daily automation cycle...")
         
         try:
@@ -103,10 +121,12 @@ class NosytAutomationSystem:
         logger.info("🌐 Web interface available at: http://localhost:8000")
         logger.info("💰 Revenue tracking dashboard: http://localhost:8000/dashboard")
         
-        # Keep running
-        while True:
-            await self.scheduler.run_pending()
-            await asyncio.sleep(60)  # Check every minute
+        # Jobs run on the event loop; keep running until cancelled
+        self.scheduler.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.scheduler.stop()
 
 async def main():
     """Main entry point"""
@@ -133,6 +153,7 @@ async def main():
     except Exception as e:
         logger.error(f"💥 Critical system error: {str(e)}")
     finally:
+        await system.shutdown()
         logger.info("👋 Nosyt Automation System stopped.")
 
 if __name__ == "__main__":
@@ -3,116 +3,306 @@
 AI Prompt Generation Engine for Nosyt Automation System
 """
 
+import aiosqlite
 import asyncio
+import hashlib
+import heapq
+import httpx
+import numpy as np
 import openai
+import orjson
 import random
-from typing import List, Dict, Tuple
+import time
+from typing import Any, Callable, Dict, Final, List, Mapping, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
 import logging
 
+try:
+    import numba
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Quality scorer vocabularies; matched as substrings, so "created" counts as "create".
+# Plain `in` checks are kept over a compiled re alternation: CPython's re backtracks at
+# each position instead of running a DFA, and measured no faster (much slower on misses)
+_STRUCTURE_MARKERS: Final[Tuple[str, ...]] = ('1.', '2.', '3.', '•', '-')
+_SPECIFIC_WORDS: Final[Tuple[str, ...]] = ('specific', 'example', 'include', 'detailed', 'step-by-step')
+_PROFESSIONAL_TERMS: Final[Tuple[str, ...]] = ('professional', 'strategic', 'analysis', 'implementation', 'optimization')
+_ACTION_WORDS: Final[Tuple[str, ...]] = ('create', 'develop', 'analyze', 'implement', 'optimize', 'design')
+
+# Flat UTF-8 pattern table for the batch scorer: one group per vocabulary above
+_SCORER_GROUPS: Final[Tuple[Tuple[str, ...], ...]] = (_STRUCTURE_MARKERS, _SPECIFIC_WORDS, _PROFESSIONAL_TERMS, _ACTION_WORDS)
+_PATTERN_BYTES: Final[np.ndarray] = np.frombuffer(b''.join(w.encode() for group in _SCORER_GROUPS for w in group), dtype=np.uint8)
+_PATTERN_OFFSETS: Final[np.ndarray] = np.cumsum([0] + [len(w.encode()) for group in _SCORER_GROUPS for w in group], dtype=np.int64)
+_PATTERN_GROUPS: Final[np.ndarray] = np.array([g for g, group in enumerate(_SCORER_GROUPS) for _ in group], dtype=np.int64)
+
+# Prompt template styles per niche
+_PROMPT_TEMPLATES: Final[Mapping[str, Tuple[str, ...]]] = MappingProxyType({
+    "Business & Marketing": (
+        "Strategic Analysis", "Campaign Planning", "Market Research",
+        "Competitive Intelligence", "Customer Journey Mapping", "ROI Optimization"
+    ),
+    "Content Creation & Copywriting": (
+        "Persuasive Writing", "Storytelling Framework", "Content Strategy",
+        "Audience Engagement", "Conversion Copywriting", "Brand Voice Development"
+    ),
+    "E-commerce & Sales": (
+        "Product Optimization", "Sales Funnel Design", "Customer Retention",
+        "Pricing Strategy", "Conversion Rate Optimization", "Customer Service Excellence"
+    ),
+    "Programming & Development": (
+        "Code Architecture", "Problem Solving", "Performance Optimization",
+        "Testing Strategy", "Documentation", "Debugging Process"
+    ),
+    "Personal Productivity": (
+        "Goal Achievement", "Time Management", "Habit Formation",
+        "Focus Enhancement", "Workflow Optimization", "Motivation Boost"
+    )
+})
+
+_DEFAULT_TEMPLATES: Final[Tuple[str, ...]] = ("General Framework", "Step-by-Step Guide", "Strategic Approach")
+
+# Generation request text; only the niche, keywords and template style vary per call
+_GEN_PREFIX: Final[str] = "Create a highly effective AI prompt for "
+
+_GEN_SUFFIX: Final[str] = """
+- Output should be practical and actionable
+- Include specific instructions and examples
+- Length: 150-300 words
+- Professional tone
+
+Also write a catchy, sales-focused title and a compelling sales
+description that highlights benefits and value.
+"""
+
+_SYSTEM_MESSAGE: Final[Dict[str, str]] = {
+    "role": "system",
+    "content": "You are an expert prompt engineer creating valuable AI prompts for business professionals. "
+               "Respond with a JSON object with keys prompt, title, description; "
+               "prompt holds only the prompt content, no explanations."
+}
+
+_SQL_CACHE_GET = "SELECT content FROM completions WHERE key = ? AND created_at >= ?"
+
+_SQL_CACHE_PUT = "INSERT OR REPLACE INTO completions (key, content, created_at) VALUES (?, ?, ?)"
+
 class PromptGenerator:
     """Advanced AI prompt generation system"""
     
     def __init__(self, config):
         self.config = config
         self.openai_client = None
+        self.cache_path = "nosyt_openai_cache.db"
+        self._cache = None
+        self._sem = None
+        self._niche_keywords: Dict[str, Tuple[Tuple[str, str], ...]] = {}
         self.quality_scorer = PromptQualityScorer()
         
     async def initialize(self):
         """Initialize the prompt generator"""
+        self._sem = asyncio.Semaphore(self.config.OPENAI_MAX_CONCURRENCY or 8)
+        
+        # (original, lowercased) keyword pairs, normalized once instead of per prompt
+        self._niche_keywords = {
+            niche: self._keyword_pairs(niche) for niche in self.config.PROFITABLE_NICHES
+        }
+        
+        # Persistent response cache so identical generation requests skip the API across runs
+        self._cache = await aiosqlite.connect(self.cache_path, isolation_level=None)
+        await self._cache.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                content TEXT,
+                created_at INTEGER
+            ) WITHOUT ROWID;
+        """)
+        await self._cache.execute(
+            "DELETE FROM completions WHERE created_at < ?", (int(time.time()) - self.config.PROMPT_CACHE_TTL,)
+        )
+        
         if self.config.OPENAI_API_KEY:
-            openai.api_key = self.config.OPENAI_API_KEY
-            self.openai_client = openai.AsyncOpenAI(api_key=self.config.OPENAI_API_KEY)
+            # One pooled HTTP/2 client so the batch fan-out reuses connections
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.config.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=self.config.OPENAI_MAX_CONNECTIONS // 2
+                ),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+                http2=True
+            )
+            self.openai_client = openai.AsyncOpenAI(api_key=self.config.OPENAI_API_KEY, http_client=http_client)
             logger.info("✅ OpenAI API initialized")
         else:
             logger.warning("⚠️ OpenAI API key not found")
     
+    async def aclose(self):
+        """Close the OpenAI client, its connection pool and the response cache"""
+        if self.openai_client:
+            await self.openai_client.close()
+            self.openai_client = None
+        if self._cache:
+            await self._cache.close()
+            self._cache = None
+    
+    def _keyword_pairs(self, niche: str) -> Tuple[Tuple[str, str], ...]:
+        """Niche keywords paired with their lowercased form"""
+        return tuple((keyword, keyword.lower()) for keyword in self.config.get_niche_keywords(niche))
+    
+    async def _chat_content(self, cache_key: Optional[str] = None, parse: Optional[Callable[[str], Any]] = None, **request) -> Any:
+        """Completion text for a chat request (parsed when parse is given), served from the persistent cache when possible"""
+        key = cache_key or hashlib.blake2b(orjson.dumps(request, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+        if parse is None and request.get("response_format"):
+            parse = orjson.loads
+        
+        if self._cache:
+            async with self._cache.execute(
+                _SQL_CACHE_GET, (key, int(time.time()) - self.config.PROMPT_CACHE_TTL)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row:
+                try:
+                    return parse(row[0]) if parse else row[0]
+                except ValueError:
+                    # Cached before this reply shape was enforced; fetch a fresh one below
+                    pass
+        
+        async with self._sem:
+            response = await self._create_completion(request)
+        content = response.choices[0].message.content
+        
+        # parse raises ValueError for a reply the caller cannot use; such a reply is never cached
+        result = parse(content) if parse else content
+        if self._cache:
+            await self._cache.execute(_SQL_CACHE_PUT, (key, content, int(time.time())))
+        return result
+    
+    async def _create_completion(self, request: Dict):
+        """completions.create call, retried with jittered exponential backoff on rate limits and connection errors"""
+        for attempt in range(self.config.MAX_RETRIES + 1):
+            try:
+                return await self.openai_client.chat.completions.create(**request)
+            except (openai.RateLimitError, openai.APIConnectionError) as e:
+                if attempt == self.config.MAX_RETRIES:
+                    raise
+                # Jitter spreads out the retries of a batch that hit the limit together
+                delay = random.uniform(1, min(20, 2 ** (attempt + 1)))
+                logger.warning(f"⏳ OpenAI request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
     async def generate_daily_batch(self) -> List[Dict]:
         """Generate daily batch of AI prompts"""
         logger.info(f"🎯 Generating {self.config.DAILY_PROMPT_GENERATION} prompts...")
         
-        all_prompts = []
+        # Niches are independent; fan out and let the semaphore bound in-flight API calls
+        niches = list(self.config.PROFITABLE_NICHES)
+        results = await asyncio.gather(
+            *(self.generate_niche_prompts(niche, 3) for niche in niches),
+            return_exceptions=True
+        )
         
-        for niche in self.config.PROFITABLE_NICHES:
-            niche_prompts = await self.generate_niche_prompts(niche, 3)
+        all_prompts = []
+        for niche, niche_prompts in zip(niches, results):
+            if isinstance(niche_prompts, Exception):
+                logger.error(f"❌ Error generating prompts for {niche}: {str(niche_prompts)}")
+                continue
             all_prompts.extend(niche_prompts)
         
-        # Sort by quality score
-        all_prompts.sort(key=lambda x: x['quality_score'], reverse=True)
+        # Cached responses can repeat a prompt within a run; keep one copy of each
+        all_prompts = list({prompt['prompt']: prompt for prompt in all_prompts}.values())
         
-        # Return top prompts
-        return all_prompts[:self.config.DAILY_PROMPT_GENERATION]
+        # Return top prompts by quality score (partial sort)
+        return heapq.nlargest(self.config.DAILY_PROMPT_GENERATION, all_prompts, key=itemgetter('quality_score'))
     
     async def generate_niche_prompts(self, niche: str, count: int) -> List[Dict]:
         """Generate prompts for specific niche"""
         logger.info(f"📝 Generating {count} prompts for {niche}...")
         
-        prompts = []
-        keywords = self.config.get_niche_keywords(niche)
+        keywords = self._niche_keywords.get(niche) or self._keyword_pairs(niche)
         
-        for i in range(count):
-            try:
-                # Generate primary prompt
-                prompt_data = await self.create_single_prompt(niche, keywords)
-                
-                # Score quality
-                quality_score = self.quality_scorer.score_prompt(prompt_data['prompt'])
-                
-                if quality_score >= self.config.MIN_PROMPT_QUALITY_SCORE:
-                    prompt_data['quality_score'] = quality_score
-                    prompt_data['niche'] = niche
-                    prompt_data['created_at'] = datetime.now().isoformat()
-                    prompts.append(prompt_data)
-                    
-            except Exception as e:
-                logger.error(f"❌ Error generating prompt for {niche}: {str(e)}")
+        # Generate primary prompts concurrently
+        results = await asyncio.gather(
+            *(self.create_single_prompt(niche, keywords) for _ in range(count)),
+            return_exceptions=True
+        )
+        
+        prompts = []
+        created_at = datetime.now().isoformat()
+        for prompt_data in results:
+            if isinstance(prompt_data, Exception):
+                logger.error(f"❌ Error generating prompt for {niche}: {str(prompt_data)}")
                 continue
+            
+            # Score quality
+            quality_score = self.quality_scorer.score_prompt(prompt_data['prompt'])
+            
+            if quality_score >= self.config.MIN_PROMPT_QUALITY_SCORE:
+                prompt_data['quality_score'] = quality_score
+                prompt_data['niche'] = niche
+                prompt_data['created_at'] = created_at
+                prompts.append(prompt_data)
         
         return prompts
     
-    async def create_single_prompt(self, niche: str, keywords: List[str]) -> Dict:
-        """Create a single high-quality prompt"""
+    async def create_single_prompt(self, niche: str, keywords: Tuple[Tuple[str, str], ...]) -> Dict:
+        """Create a single high-quality prompt from (original, lowercased) keyword pairs"""
         
         # Select random keywords
-        selected_keywords = random.sample(keywords, min(3, len(keywords)))
+        selected = random.sample(keywords, min(3, len(keywords)))
+        selected_keywords = [keyword for keyword, _ in selected]
         
         # Prompt generation templates
         templates = self.get_prompt_templates(niche)
         template = random.choice(templates)
         
         # Generate using AI
-        generation_prompt = f"""
-        Create a highly effective AI prompt for {niche} professionals.
-        
-        Requirements:
-        - Focus on: {', '.join(selected_keywords)}
-        - Template style: {template}
-        - Output should be practical and actionable
-        - Include specific instructions and examples
-        - Length: 150-300 words
-        - Professional tone
+        generation_prompt = (
+            _GEN_PREFIX + niche + " professionals.\n\nRequirements:\n- Focus on: "
+            + _join_keywords(tuple(sorted(selected_keywords))) + "\n- Template style: " + template + _GEN_SUFFIX
+        )
         
-        Generate only the prompt content, no explanations.
-        """
+        # Requests differing only in keyword order or case produce equivalent prompts; share one entry
+        canonical = (
+            self.config.AI_MODELS['primary'], niche, template,
+            tuple(sorted(lowered for _, lowered in selected))
+        )
+        cache_key = hashlib.blake2b(repr(canonical).encode(), digest_size=16).hexdigest()
         
+        # Not streamed: title and description arrive in this same completion, so there is no
+        # follow-up call to start early, and the cache and JSON parse need the whole body anyway
         try:
-            response = await self.openai_client.chat.completions.create(
+            generated = await self._chat_content(
+                cache_key,
+                _parse_generated,
                 model=self.config.AI_MODELS['primary'],
-                messages=[
-                    {"role": "system", "content": "You are an expert prompt engineer creating valuable AI prompts for business professionals."},
-                    {"role": "user", "content": generation_prompt}
-                ],
-                max_tokens=500,
-                temperature=0.7
+                messages=[_SYSTEM_MESSAGE, {"role": "user", "content": generation_prompt}],
+                # Room for the prompt body plus title and description
+                max_tokens=700,
+                temperature=0.7,
+                response_format={"type": "json_object"}
             )
+            prompt_content = generated['prompt'].strip()
             
-            prompt_content = response.choices[0].message.content.strip()
-            
-            # Generate title and description
-            title = await self.generate_prompt_title(prompt_content, niche)
-            description = await self.generate_prompt_description(prompt_content, niche)
+            # Title and description come back in the same response; generate any that are missing
+            title = (generated.get('title') or '').strip()
+            description = (generated.get('description') or '').strip()
+            if not title and not description:
+                # Independent calls - run them together
+                title, description = await asyncio.gather(
+                    self.generate_prompt_title(prompt_content, niche),
+                    self.generate_prompt_description(prompt_content, niche)
+                )
+            elif not title:
+                title = await self.generate_prompt_title(prompt_content, niche)
+            elif not description:
+                description = await self.generate_prompt_description(prompt_content, niche)
             
             return {
                 'title': title,
@@ -127,32 +317,9 @@ class PromptGenerator:
             # Fallback to template-based generation
             return self.generate_template_prompt(niche, selected_keywords, template)
     
-    def get_prompt_templates(self, niche: str) -> List[str]:
+    def get_prompt_templates(self, niche: str) -> Tuple[str, ...]:
         """Get prompt templates for each niche"""
-        templates = {
-            "Business & Marketing": [
-                "Strategic Analysis", "Campaign Planning", "Market Research",
-                "Competitive Intelligence", "Customer Journey Mapping", "ROI Optimization"
-            ],
-            "Content Creation & Copywriting": [
-                "Persuasive Writing", "Storytelling Framework", "Content Strategy",
-                "Audience Engagement", "Conversion Copywriting", "Brand Voice Development"
-            ],
-            "E-commerce & Sales": [
-                "Product Optimization", "Sales Funnel Design", "Customer Retention",
-                "Pricing Strategy", "Conversion Rate Optimization", "Customer Service Excellence"
-            ],
-            "Programming & Development": [
-                "Code Architecture", "Problem Solving", "Performance Optimization",
-                "Testing Strategy", "Documentation", "Debugging Process"
-            ],
-            "Personal Productivity": [
-                "Goal Achievement", "Time Management", "Habit Formation",
-                "Focus Enhancement", "Workflow Optimization", "Motivation Boost"
-            ]
-        }
-        
-        return templates.get(niche, ["General Framework", "Step-by-Step Guide", "Strategic Approach"])
+        return _PROMPT_TEMPLATES.get(niche, _DEFAULT_TEMPLATES)
     
     def generate_template_prompt(self, niche: str, keywords: List[str], template: str) -> Dict:
         """Generate prompt using templates (fallback method)"""
@@ -194,7 +361,7 @@ class PromptGenerator:
     async def generate_prompt_title(self, prompt_content: str, niche: str) -> str:
         """Generate catchy title for prompt"""
         try:
-            response = await self.openai_client.chat.completions.create(
+            content = await self._chat_content(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "Create catchy, sales-focused titles for AI prompts."},
@@ -203,14 +370,14 @@ class PromptGenerator:
                 max_tokens=50,
                 temperature=0.8
             )
-            return response.choices[0].message.content.strip()
+            return content.strip()
         except:
             return f"Professional {niche} AI Prompt"
     
     async def generate_prompt_description(self, prompt_content: str, niche: str) -> str:
         """Generate marketing description for prompt"""
         try:
-            response = await self.openai_client.chat.completions.create(
+            content = await self._chat_content(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "Write compelling product descriptions for AI prompts that highlight benefits and value."},
@@ -219,41 +386,108 @@ class PromptGenerator:
                 max_tokens=150,
                 temperature=0.7
             )
-            return response.choices[0].message.content.strip()
+            return content.strip()
         except:
             return f"High-quality AI prompt for {niche} professionals. Get instant results and boost your productivity."
 
+def _parse_generated(content: str) -> Dict:
+    """JSON generation reply; ValueError unless it is an object with a non-empty prompt string"""
+    generated = orjson.loads(content)
+    if not isinstance(generated, dict) or not isinstance(generated.get('prompt'), str) or not generated['prompt'].strip():
+        raise ValueError("generation reply has no prompt")
+    return generated
+
+@lru_cache(maxsize=256)
+def _join_keywords(keywords: Tuple[str, ...]) -> str:
+    """Comma-joined keyword list; the same few combinations recur across a batch"""
+    return ', '.join(keywords)
+
 class PromptQualityScorer:
     """Quality scoring system for AI prompts"""
     
     def score_prompt(self, prompt: str) -> float:
         """Score prompt quality from 0.0 to 1.0"""
-        score = 0.0
-        
-        # Length check (150-300 words optimal)
-        word_count = len(prompt.split())
-        if 150 <= word_count <= 300:
-            score += 0.2
-        elif 100 <= word_count <= 400:
-            score += 0.1
-        
-        # Structure check (numbered lists, clear sections)
-        if any(marker in prompt for marker in ['1.', '2.', '3.', '•', '-']):
-            score += 0.2
-        
-        # Specificity check (specific terms, examples)
-        specific_words = ['specific', 'example', 'include', 'detailed', 'step-by-step']
-        if any(word in prompt.lower() for word in specific_words):
-            score += 0.2
+        return _score_prompt(prompt)
+    
+    def score_prompts_batch(self, prompts: List[str]) -> np.ndarray:
+        """Score many prompts at once; JIT-compiled and parallel when numba is installed"""
+        if not _NUMBA_AVAILABLE:
+            # Bypass the memo so bulk rescoring does not evict hot entries
+            return np.fromiter(map(_score_prompt.__wrapped__, prompts), dtype=np.float64, count=len(prompts))
         
-        # Professional language check
-        professional_terms = ['professional', 'strategic', 'analysis', 'implementation', 'optimization']
-        if any(term in prompt.lower() for term in professional_terms):
-            score += 0.2
+        encoded = [prompt.lower().encode() for prompt in prompts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        text = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        word_counts = np.fromiter((len(prompt.split()) for prompt in prompts), dtype=np.int64, count=len(prompts))
+        return _score_kernel(text, offsets, word_counts, _PATTERN_BYTES, _PATTERN_OFFSETS, _PATTERN_GROUPS, len(_SCORER_GROUPS))
+
+@lru_cache(maxsize=4096)
+def _score_prompt(prompt: str) -> float:
+    """Memoized prompt scorer; template and fallback prompts recur across runs"""
+    score = 0.0
+    prompt_lower = prompt.lower()
+    
+    # Length check (150-300 words optimal)
+    word_count = len(prompt.split())
+    if 150 <= word_count <= 300:
+        score += 0.2
+    elif 100 <= word_count <= 400:
+        score += 0.1
+    
+    # Structure check (numbered lists, clear sections)
+    if any(marker in prompt for marker in _STRUCTURE_MARKERS):
+        score += 0.2
+    
+    # Specificity check (specific terms, examples)
+    if any(word in prompt_lower for word in _SPECIFIC_WORDS):
+        score += 0.2
+    
+    # Professional language check
+    if any(term in prompt_lower for term in _PROFESSIONAL_TERMS):
+        score += 0.2
+    
+    # Actionable language check
+    if any(word in prompt_lower for word in _ACTION_WORDS):
+        score += 0.2
+    
+    return min(score, 1.0)
+
+def _score_kernel(text, offsets, word_counts, patterns, pattern_offsets, pattern_groups, n_groups):
+    """Batch form of _score_prompt over concatenated lowercased UTF-8 prompts"""
+    n = len(offsets) - 1
+    scores = np.zeros(n)
+    for i in numba.prange(n):
+        start, end = offsets[i], offsets[i + 1]
+        found = np.zeros(n_groups, dtype=np.bool_)
+        remaining = n_groups
+        for pos in range(start, end):
+            for p in range(len(pattern_groups)):
+                group = pattern_groups[p]
+                p_start = pattern_offsets[p]
+                p_len = pattern_offsets[p + 1] - p_start
+                if found[group] or pos + p_len > end:
+                    continue
+                k = 0
+                while k < p_len and text[pos + k] == patterns[p_start + k]:
+                    k += 1
+                if k == p_len:
+                    found[group] = True
+                    remaining -= 1
+            if remaining == 0:
+                break
         
-        # Actionable language check
-        action_words = ['create', 'develop', 'analyze', 'implement', 'optimize', 'design']
-        if any(word in prompt.lower() for word in action_words):
+        # Same accumulation order as _score_prompt so scores compare equal
+        score = 0.0
+        if 150 <= word_counts[i] <= 300:
             score += 0.2
-        
-        return min(score, 1.0)
\ No newline at end of file
+        elif 100 <= word_counts[i] <= 400:
+            score += 0.1
+        for group in range(n_groups):
+            if found[group]:
+                score += 0.2
+        scores[i] = min(score, 1.0)
+    return scores
+
+if _NUMBA_AVAILABLE:
+    _score_kernel = numba.njit(parallel=True, cache=True)(_score_kernel)
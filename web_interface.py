@@ -3,43 +3,71 @@
 Web Interface for Nosyt AI Prompt Automation System
 """
 
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import BackgroundTasks, FastAPI, Request, HTTPException
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+import jinja2
 import uvicorn
 from datetime import datetime
-import json
+import hashlib
 import logging
+import time
+from typing import Final, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Templates are compiled once; nothing edits them while the server runs
+_TEMPLATE_ENV: Final[jinja2.Environment] = jinja2.Environment(
+    loader=jinja2.FileSystemLoader("templates"), autoescape=True, auto_reload=False, cache_size=400
+)
+
 def create_app(automation_system):
     """Create FastAPI web application"""
     
     app = FastAPI(
         title="Nosyt AI Prompt Automation",
         description="Professional AI Prompt Generation & WHOP Integration",
-        version="1.0.0"
+        version="1.0.0",
+        # Routes return ORJSONResponse directly; a bare dict would still pass through jsonable_encoder
+        default_response_class=ORJSONResponse
     )
     
-    templates = Jinja2Templates(directory="templates")
+    try:
+        dashboard_template = _TEMPLATE_ENV.get_template("dashboard.html")
+    except jinja2.TemplateNotFound:
+        logger.warning("⚠️ dashboard.html not found, serving the simple dashboard")
+        dashboard_template = None
+    
+    # (rendered_at, etag, body) of the last rendered dashboard
+    dashboard_cache: Tuple[float, str, bytes] = (0.0, "", b"")
     
     @app.get("/", response_class=HTMLResponse)
     async def dashboard(request: Request):
         """Main dashboard"""
+        nonlocal dashboard_cache
+        if dashboard_template is None:
+            return HTMLResponse(create_simple_dashboard(), status_code=200)
         try:
-            # Get latest analytics
-            daily_report = await automation_system.analytics.generate_daily_report()
-            revenue_metrics = await automation_system.analytics.get_revenue_metrics()
+            rendered_at, etag, body = dashboard_cache
+            if not body or time.monotonic() - rendered_at > automation_system.config.DASHBOARD_CACHE_TTL:
+                # Get latest analytics
+                daily_report = await automation_system.analytics.generate_daily_report()
+                revenue_metrics = await automation_system.analytics.get_revenue_metrics()
+                
+                body = dashboard_template.render(
+                    request=request,
+                    daily_report=daily_report,
+                    revenue_metrics=revenue_metrics,
+                    company_name=automation_system.config.COMPANY_NAME,
+                    current_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                ).encode()
+                etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+                dashboard_cache = (time.monotonic(), etag, body)
             
-            return templates.TemplateResponse("dashboard.html", {
-                "request": request,
-                "daily_report": daily_report,
-                "revenue_metrics": revenue_metrics,
-                "company_name": automation_system.config.COMPANY_NAME,
-                "current_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
+            headers = {"ETag": etag, "Cache-Control": f"max-age={automation_system.config.DASHBOARD_CACHE_TTL}"}
+            if request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers=headers)
+            return HTMLResponse(body, headers=headers)
         except Exception as e:
             logger.error(f"Dashboard error: {str(e)}")
             return HTMLResponse(create_simple_dashboard(), status_code=200)
@@ -49,61 +77,65 @@ def create_app(automation_system):
         """Get daily analytics data"""
         try:
             report = await automation_system.analytics.generate_daily_report()
-            return JSONResponse(report)
+            return ORJSONResponse(report)
         except Exception as e:
             logger.error(f"Analytics API error: {str(e)}")
-            return JSONResponse({"error": "Analytics unavailable"}, status_code=500)
+            return ORJSONResponse({"error": "Analytics unavailable"}, status_code=500)
     
     @app.get("/api/analytics/weekly")
     async def get_weekly_analytics():
         """Get weekly analytics data"""
         try:
             report = await automation_system.analytics.generate_weekly_report()
-            return JSONResponse(report)
+            return ORJSONResponse(report)
         except Exception as e:
-            return JSONResponse({"error": "Weekly analytics unavailable"}, status_code=500)
+            return ORJSONResponse({"error": "Weekly analytics unavailable"}, status_code=500)
     
     @app.get("/api/revenue")
     async def get_revenue_metrics():
         """Get revenue metrics"""
         try:
             metrics = await automation_system.analytics.get_revenue_metrics()
-            return JSONResponse(metrics)
+            return ORJSONResponse(metrics)
         except Exception as e:
-            return JSONResponse({"error": "Revenue metrics unavailable"}, status_code=500)
+            return ORJSONResponse({"error": "Revenue metrics unavailable"}, status_code=500)
     
     @app.get("/api/niches")
     async def get_niche_performance():
         """Get niche performance data"""
         try:
             performance = await automation_system.analytics.get_niche_performance()
-            return JSONResponse(performance)
+            return ORJSONResponse(performance)
         except Exception as e:
-            return JSONResponse({"error": "Niche performance unavailable"}, status_code=500)
+            return ORJSONResponse({"error": "Niche performance unavailable"}, status_code=500)
     
     @app.get("/api/prediction/{days}")
     async def get_revenue_prediction(days: int):
         """Get revenue prediction"""
         try:
             prediction = await automation_system.analytics.predict_revenue(days)
-            return JSONResponse(prediction)
+            return ORJSONResponse(prediction)
         except Exception as e:
-            return JSONResponse({"error": "Prediction unavailable"}, status_code=500)
+            return ORJSONResponse({"error": "Prediction unavailable"}, status_code=500)
     
     @app.post("/api/generate")
-    async def trigger_generation():
+    async def trigger_generation(background_tasks: BackgroundTasks):
         """Manually trigger prompt generation"""
         try:
-            await automation_system.run_daily_automation()
-            return JSONResponse({"status": "success", "message": "Generation started"})
+            if automation_system.automation_lock.locked():
+                return ORJSONResponse({"status": "running", "message": "Generation already in progress"}, status_code=409)
+            
+            # Runs after the response is sent; the cycle can take minutes
+            background_tasks.add_task(automation_system.run_daily_automation)
+            return ORJSONResponse({"status": "accepted", "message": "Generation started"}, status_code=202)
         except Exception as e:
             logger.error(f"Manual generation error: {str(e)}")
-            return JSONResponse({"error": "Generation failed"}, status_code=500)
+            return ORJSONResponse({"error": "Generation failed"}, status_code=500)
     
     @app.get("/health")
     async def health_check():
         """System health check endpoint"""
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "system": "Nosyt AI Prompt Automation",
@@ -112,9 +144,8 @@ def create_app(automation_system):
     
     return app
 
-def create_simple_dashboard() -> str:
-    """Create simple HTML dashboard when templates aren't available"""
-    return f"""
+# Fallback dashboard page; only the footer timestamp varies, so it is split once at import
+_SIMPLE_DASHBOARD_TEMPLATE: Final[str] = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -122,71 +153,71 @@ def create_simple_dashboard() -> str:
         <meta charset="utf-8">
         <meta name="viewport" content="width=device-width, initial-scale=1">
         <style>
-            body {{
+            body {
                 font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
                 margin: 0;
                 padding: 20px;
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 color: white;
                 min-height: 100vh;
-            }}
-            .container {{
+            }
+            .container {
                 max-width: 1200px;
                 margin: 0 auto;
                 background: rgba(255,255,255,0.1);
                 border-radius: 20px;
                 padding: 30px;
                 backdrop-filter: blur(10px);
-            }}
-            .header {{
+            }
+            .header {
                 text-align: center;
                 margin-bottom: 40px;
-            }}
-            .header h1 {{
+            }
+            .header h1 {
                 font-size: 3em;
                 margin-bottom: 10px;
                 text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-            }}
-            .stats-grid {{
+            }
+            .stats-grid {
                 display: grid;
                 grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
                 gap: 20px;
                 margin-bottom: 40px;
-            }}
-            .stat-card {{
+            }
+            .stat-card {
                 background: rgba(255,255,255,0.2);
                 border-radius: 15px;
                 padding: 25px;
                 text-align: center;
                 transition: transform 0.3s ease;
-            }}
-            .stat-card:hover {{
+            }
+            .stat-card:hover {
                 transform: translateY(-5px);
-            }}
-            .stat-number {{
+            }
+            .stat-number {
                 font-size: 2.5em;
                 font-weight: bold;
                 margin-bottom: 10px;
-            }}
-            .stat-label {{
+            }
+            .stat-label {
                 font-size: 1.1em;
                 opacity: 0.9;
-            }}
-            .status {{
+            }
+            .status {
                 background: rgba(0,255,0,0.2);
                 border: 2px solid rgba(0,255,0,0.5);
                 border-radius: 10px;
                 padding: 15px;
                 text-align: center;
                 margin-top: 20px;
-            }}
-            .api-section {{
+            }
+            .api-section {
                 margin-top: 40px;
                 background: rgba(255,255,255,0.1);
                 border-radius: 15px;
                 padding: 20px;
-            }}
-            .api-button {{
+            }
+            .api-button {
                 background: linear-gradient(45deg, #FF6B6B, #4ECDC4);
                 border: none;
                 border-radius: 25px;
@@ -196,11 +227,11 @@ def create_simple_dashboard() -> str:
                 cursor: pointer;
                 font-size: 1em;
                 transition: all 0.3s ease;
-            }}
-            .api-button:hover {{
+            }
+            .api-button:hover {
                 transform: scale(1.05);
                 shadow: 0 5px 15px rgba(0,0,0,0.3);
-            }}
+            }
         </style>
     </head>
     <body>
@@ -244,65 +275,71 @@ def create_simple_dashboard() -> str:
             </div>
             
             <div style="text-align: center; margin-top: 40px; opacity: 0.8;">
-                <p>Built with ❤️ by Nosyt LLC | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+                <p>Built with ❤️ by Nosyt LLC | {TIMESTAMP}</p>
             </div>
         </div>
         
         <script>
-            async function triggerGeneration() {{
+            async function triggerGeneration() {
                 const result = document.getElementById('result');
                 result.style.display = 'block';
                 result.innerHTML = '🔄 Generating new AI prompts...';
                 
-                try {{
-                    const response = await fetch('/api/generate', {{ method: 'POST' }});
+                try {
+                    const response = await fetch('/api/generate', { method: 'POST' });
                     const data = await response.json();
                     result.innerHTML = '✅ ' + (data.message || 'Generation completed!');
-                }} catch (error) {{
+                } catch (error) {
                     result.innerHTML = '❌ Generation request sent (running in background)';
-                }}
-            }}
+                }
+            }
             
-            async function viewAnalytics() {{
+            async function viewAnalytics() {
                 const result = document.getElementById('result');
                 result.style.display = 'block';
                 result.innerHTML = '📈 Loading analytics...';
                 
-                try {{
+                try {
                     const response = await fetch('/api/analytics/daily');
                     const data = await response.json();
                     result.innerHTML = `
                         <h4>📈 Today's Performance</h4>
-                        <p>Products Created: ${{data.products_created || 0}}</p>
-                        <p>Revenue: $${{data.daily_revenue || 0}}</p>
-                        <p>Sales: ${{data.daily_sales || 0}}</p>
-                        <p>Avg Quality: ${{data.avg_quality_score || 0}}/1.0</p>
+                        <p>Products Created: ${data.products_created || 0}</p>
+                        <p>Revenue: $${data.daily_revenue || 0}</p>
+                        <p>Sales: ${data.daily_sales || 0}</p>
+                        <p>Avg Quality: ${data.avg_quality_score || 0}/1.0</p>
                     `;
-                }} catch (error) {{
+                } catch (error) {
                     result.innerHTML = '📈 Analytics system ready - data will appear after first automation run';
-                }}
-            }}
+                }
+            }
             
-            async function checkHealth() {{
+            async function checkHealth() {
                 const result = document.getElementById('result');
                 result.style.display = 'block';
                 result.innerHTML = '💓 Checking system health...';
                 
-                try {{
+                try {
                     const response = await fetch('/health');
                     const data = await response.json();
                     result.innerHTML = `
                         <h4>💓 System Health</h4>
-                        <p>Status: ${{data.status}}</p>
-                        <p>System: ${{data.system}}</p>
-                        <p>Version: ${{data.version}}</p>
-                        <p>Timestamp: ${{data.timestamp}}</p>
+                        <p>Status: ${data.status}</p>
+                        <p>System: ${data.system}</p>
+                        <p>Version: ${data.version}</p>
+                        <p>Timestamp: ${data.timestamp}</p>
                     `;
-                }} catch (error) {{
+                } catch (error) {
                     result.innerHTML = '❌ Health check failed: ' + error.message;
-                }}
-            }}
+                }
+            }
         </script>
     </body>
     </html>
-    """
\ No newline at end of file
+    """
+
+_SIMPLE_DASHBOARD_HEAD, _SIMPLE_DASHBOARD_TAIL = _SIMPLE_DASHBOARD_TEMPLATE.split("{TIMESTAMP}")
+
+def create_simple_dashboard() -> str:
+    """Create simple HTML dashboard when templates aren't available"""
+    return _SIMPLE_DASHBOARD_HEAD + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + _SIMPLE_DASHBOARD_TAIL
@@ -4,29 +4,276 @@ WHOP Marketplace Integration for Nosyt AI Prompt Automation
 """
 
 import aiohttp
+import aiosqlite
 import asyncio
-import json
-from typing import List, Dict, Optional
+import hashlib
+import itertools
+import orjson
+import string
+import time
+from types import MappingProxyType
+from typing import AsyncIterable, AsyncIterator, Dict, Final, FrozenSet, Iterable, List, Mapping, Optional, Tuple, Union
 import logging
-from datetime import datetime
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Throttled or briefly unavailable; safe to retry a product POST
+_RETRY_STATUSES: Final[FrozenSet[int]] = frozenset({429, 502, 503, 504})
+
+def _retry_after(headers: Mapping[str, str], default: float) -> float:
+    """Seconds to wait from a Retry-After header, or default when absent or not numeric"""
+    try:
+        return max(float(headers["Retry-After"]), 0.0)
+    except (KeyError, ValueError):
+        return default
+
+# Prompts buffered ahead of the uploaders
+_UPLOAD_QUEUE_SIZE: Final[int] = 32
+
+# Seconds before a single stats fetch is abandoned so one slow product cannot stall the batch
+_STATS_TIMEOUT: Final[float] = 10.0
+
+# Product ids per batch stats request
+_STATS_BATCH_SIZE: Final[int] = 100
+
+# Tasks polling and storing stats for freshly created products while uploads continue
+_ANALYTICS_WORKERS: Final[int] = 4
+
+# Stats reported for every product in mock mode
+_MOCK_STATS: Final[Mapping[str, float]] = MappingProxyType({
+    "views": 45,
+    "sales": 3,
+    "revenue": 135,
+    "conversion_rate": 0.067
+})
+
+# Product description layout; only the per-prompt fields are substituted
+_DESC_TEMPLATE: Final[string.Template] = string.Template("""🤖 **Professional AI Prompt for $niche**
+
+$description
+
+**🎯 What You Get:**
+• High-quality AI prompt (150-300 words)
+• Detailed instructions and examples
+• Ready-to-use with ChatGPT, Claude, or any AI
+• Professional results in minutes
+• Keywords: $keywords
+
+**💡 Perfect For:**
+• $niche professionals
+• Content creators and marketers
+• Business owners and entrepreneurs
+• Anyone wanting to save time with AI
+
+**⚡ Instant Delivery:**
+Download immediately after purchase - no waiting!
+
+**🏆 Quality Guarantee:**
+Quality Score: $quality/1.0
+Created by Nosyt LLC - Professional AI Solutions
+
+**🔥 Limited Time:** Get this proven prompt template now!
+
+---
+*Built by Nosyt LLC - Your AI Automation Experts*""")
+
+@lru_cache(maxsize=32)
+def _description_parts(niche: str) -> Tuple[str, str, str, str]:
+    """_DESC_TEMPLATE specialized to one niche, split around the description, keywords and quality slots"""
+    return tuple(_DESC_TEMPLATE.substitute(niche=niche, description="\0", keywords="\0", quality="\0").split("\0"))
+
+# Fixed sections of the downloadable prompt file
+_FILE_USAGE: Final[str] = """
+
+## Usage Instructions:
+
+1. Copy the prompt above
+2. Paste it into ChatGPT, Claude, or your preferred AI
+3. Replace any [PLACEHOLDER] text with your specific details
+4. Run the prompt and get professional results!
+
+## Keywords:
+"""
+
+_FILE_FOOTER: Final[str] = """
+
+---
+Created by Nosyt LLC
+Professional AI Solutions
+"""
+
+# WHOP category per niche; anything else is listed under "tools"
+_CATEGORY_MAPPING: Final[Mapping[str, str]] = MappingProxyType({
+    "Business & Marketing": "business",
+    "Content Creation & Copywriting": "content",
+    "E-commerce & Sales": "ecommerce",
+    "Programming & Development": "development",
+    "Personal Productivity": "productivity",
+    "Social Media Marketing": "marketing",
+    "Email Marketing": "marketing",
+    "SEO & Digital Marketing": "marketing"
+})
+
+# Tags appended to every product's keywords
+_EXTRA_TAGS: Final[Tuple[str, ...]] = ("AI", "Prompts", "Automation")
+
+# Product fields identical for every upload
+_BASE_PRODUCT: Final[Mapping[str, object]] = MappingProxyType({
+    "type": "digital_product",
+    "instant_delivery": True,
+    "unlimited_stock": True
+})
+
+_JSON_HEADERS: Final[Mapping[str, str]] = MappingProxyType({"Content-Type": "application/json"})
+
+def _build_product_files(prompt: Dict, keywords: Optional[str] = None) -> List[Dict]:
+    """Build the downloadable prompt file; pure, so it is safe to call from any thread"""
+    if keywords is None:
+        keywords = ', '.join(prompt['keywords'])
+    
+    # Create formatted prompt file
+    prompt_content = (
+        f"# {prompt['title']}\n\n## AI Prompt:\n\n{prompt['prompt']}{_FILE_USAGE}{keywords}"
+        f"\n\n## Template Type:\n{prompt['template_type']}\n\n## Created:\n{prompt['created_at']}{_FILE_FOOTER}"
+    )
+    
+    # Encoded once here; uploaded as a multipart file part with the product
+    return [
+        {
+            "name": f"{prompt['title'].replace(' ', '_')}.txt",
+            "content": prompt_content.encode(),
+            "type": "text/plain"
+        }
+    ]
+
+def _product_form(metadata: bytes, files: List[Dict]) -> aiohttp.MultipartWriter:
+    """multipart/form-data body: the product JSON, then one part per file; built per attempt so retries resend it"""
+    form = aiohttp.MultipartWriter("form-data")
+    form.append(metadata, {"Content-Type": "application/json"}).set_content_disposition("form-data", name="product")
+    for file in files:
+        part = form.append(file["content"], {"Content-Type": file["type"]})
+        part.set_content_disposition("form-data", name="files", filename=file["name"])
+    return form
+
+_SQL_UPLOADED_GET = "SELECT product_id FROM uploads WHERE key = ? AND created_at >= ?"
+
+_SQL_UPLOADED_PUT = "INSERT OR REPLACE INTO uploads (key, product_id, created_at) VALUES (?, ?, ?)"
+
+class _TokenBucket:
+    """Continuously refilled request budget, corrected from WHOP's rate-limit headers"""
+    
+    def __init__(self, capacity: int, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate  # Requests per second
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        """Add the budget accrued since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+    
+    async def acquire(self):
+        """Wait until one request fits in the budget; only sleeps when the bucket is empty"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.refill_rate)
+    
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Clamp the local budget to X-RateLimit-Remaining, holding off until X-RateLimit-Reset when it is spent"""
+        try:
+            remaining = float(headers["X-RateLimit-Remaining"])
+        except (KeyError, ValueError):
+            return
+        
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+        if remaining < 1:
+            try:
+                reset = float(headers["X-RateLimit-Reset"])
+            except (KeyError, ValueError):
+                return
+            # Either seconds until the window resets or an epoch timestamp
+            reset_in = reset - time.time() if reset > 1e9 else reset
+            self.tokens = min(self.tokens, 1 - max(reset_in, 0.0) * self.refill_rate)
+
 class WhopIntegration:
     """WHOP marketplace API integration"""
     
-    def __init__(self, config):
+    def __init__(self, config, session: Optional[aiohttp.ClientSession] = None):
         self.config = config
         self.base_url = "https://api.whop.com/v1"
-        self.session = None
+        # A caller-supplied session is shared with other users and left open on close()
+        self.session = session
+        self._owns_session = session is None
+        self._sem = None
+        self._bucket = None
+        self._batch_stats_supported = True
+        self.cache_path = "nosyt_whop_uploads.db"
+        self._uploaded = None
+        self._analytics_q: Optional[asyncio.Queue] = None
+        self._analytics_workers: List[asyncio.Task] = []
+        # Without an API key every call would be rejected; go straight to mock mode
+        self._is_mock = config.WHOP_MOCK or not config.WHOP_API_KEY
+        # Unique across concurrent mock uploads and runs; a wall-clock id collided within one tick
+        self._mock_prefix = f"mock_{time.time_ns()}"
+        self._mock_counter = itertools.count()
+        # Sent per request so a shared session works too; Content-Type varies (multipart uploads, JSON otherwise)
         self.headers = {
-            "Authorization": f"Bearer {config.WHOP_API_KEY}",
-            "Content-Type": "application/json"
+            "Authorization": f"Bearer {config.WHOP_API_KEY}"
         }
+        self._json_headers = {**self.headers, **_JSON_HEADERS}
     
     async def initialize(self):
         """Initialize WHOP API connection"""
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        self._sem = asyncio.Semaphore(self.config.WHOP_CONCURRENCY or 8)
+        self._bucket = _TokenBucket(self.config.WHOP_RPM, self.config.WHOP_RPM / 60)
+        # Created products are polled for stats as they arrive instead of after the whole batch
+        self._analytics_q = asyncio.Queue()
+        self._analytics_workers = [
+            asyncio.create_task(self._analytics_worker()) for _ in range(_ANALYTICS_WORKERS)
+        ]
+        
+        if self._is_mock:
+            # Nothing will reach the API; skip the session and the connection test
+            logger.info("🔧 Running in mock mode for development")
+            return
+        
+        if self.session is None:
+            # Every call goes to one host: cap the pool per host, keep connections warm and cache DNS
+            connector = aiohttp.TCPConnector(
+                limit=64,
+                limit_per_host=self.config.WHOP_MAX_CONNECTIONS,
+                ttl_dns_cache=300,
+                keepalive_timeout=75
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30, connect=5, sock_read=25),
+                trust_env=True
+            )
+        
+        # Products already uploaded, keyed by payload hash, so a re-run does not post them again
+        self._uploaded = await aiosqlite.connect(self.cache_path, isolation_level=None)
+        await self._uploaded.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS uploads (
+                key TEXT PRIMARY KEY,
+                product_id TEXT,
+                created_at INTEGER
+            ) WITHOUT ROWID;
+        """)
+        await self._uploaded.execute(
+            "DELETE FROM uploads WHERE created_at < ?", (int(time.time()) - self.config.WHOP_DEDUP_TTL,)
+        )
         
         # Test API connection
         try:
@@ -35,195 +282,288 @@ class WhopIntegration:
         except Exception as e:
             logger.error(f"❌ WHOP API connection failed: {str(e)}")
             # Use mock mode for development
-            self.mock_mode = True
+            self._is_mock = True
+            await self._close_session()
             logger.info("🔧 Running in mock mode for development")
     
     async def test_connection(self):
         """Test WHOP API connection"""
-        async with self.session.get(f"{self.base_url}/me") as response:
+        async with self.session.get(f"{self.base_url}/me", headers=self.headers) as response:
             if response.status == 200:
-                data = await response.json()
+                data = orjson.loads(await response.read())
                 logger.info(f"🔗 Connected to WHOP as: {data.get('username', 'Unknown')}")
             else:
                 raise Exception(f"API test failed with status {response.status}")
     
-    async def create_products(self, prompts: List[Dict], marketing_content: Dict) -> List[str]:
-        """Create products on WHOP marketplace"""
-        logger.info(f"🛒 Creating {len(prompts)} products on WHOP...")
+    async def create_products(self, prompts: Union[Iterable[Dict], AsyncIterable[Dict]], marketing_content: Dict) -> List[str]:
+        """Create products on WHOP from a list or an async stream of prompts; returns only newly created ids"""
+        return [
+            product_id async for _, product_id, reused in self._create_products_iter(prompts, marketing_content)
+            if not reused
+        ]
+    
+    async def create_products_stream(self, prompts: Union[Iterable[Dict], AsyncIterable[Dict]], marketing_content: Dict) -> AsyncIterator[bytes]:
+        """Create products, yielding one JSON line per product as soon as it is created"""
+        created = self._create_products_iter(prompts, marketing_content)
+        try:
+            async for prompt, product_id, reused in created:
+                yield orjson.dumps({
+                    "prompt": prompt['title'], "niche": prompt.get('niche'), "product_id": product_id, "reused": reused
+                }) + b"\n"
+        finally:
+            # Stop the pipeline as soon as this stream is closed, not whenever it is garbage collected
+            await created.aclose()
+    
+    async def _create_products_iter(self, prompts: Union[Iterable[Dict], AsyncIterable[Dict]], marketing_content: Dict) -> AsyncIterator[Tuple[Dict, str, bool]]:
+        """(prompt, product_id, reused) for each created product, in completion order; reused marks an earlier upload"""
+        logger.info("🛒 Creating products on WHOP...")
         
-        product_ids = []
+        # Bounded queue between prompt source and uploaders: a stream is pulled only as fast as
+        # products upload, so memory stays flat and uploads start before the source finishes
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_UPLOAD_QUEUE_SIZE)
+        created: asyncio.Queue = asyncio.Queue()
+        workers = self.config.WHOP_CONCURRENCY or 8
         
-        for prompt in prompts:
+        async def produce():
             try:
-                product_id = await self.create_single_product(prompt, marketing_content)
-                if product_id:
-                    product_ids.append(product_id)
-                    logger.info(f"✅ Created product: {prompt['title']} (ID: {product_id})")
-                
-                # Rate limiting
-                await asyncio.sleep(1)
-                
+                if isinstance(prompts, AsyncIterable):
+                    async for prompt in prompts:
+                        await queue.put(prompt)
+                else:
+                    for prompt in prompts:
+                        await queue.put(prompt)
             except Exception as e:
-                logger.error(f"❌ Failed to create product {prompt['title']}: {str(e)}")
-                continue
+                logger.error(f"❌ Prompt source failed: {str(e)}")
+            # One stop marker per worker; skipped when cancelled, the workers are cancelled too
+            for _ in range(workers):
+                await queue.put(None)
+        
+        async def upload():
+            try:
+                while (prompt := await queue.get()) is not None:
+                    product_id, reused = await self._create_one_logged(prompt, marketing_content)
+                    if product_id:
+                        if self._analytics_q is not None:
+                            self._analytics_q.put_nowait(product_id)
+                        await created.put((prompt, product_id, reused))
+            finally:
+                # One end marker per worker
+                await created.put(None)
         
-        logger.info(f"🎉 Successfully created {len(product_ids)} products on WHOP")
-        return product_ids
+        tasks = [asyncio.create_task(produce()), *(asyncio.create_task(upload()) for _ in range(workers))]
+        count = 0
+        reused_count = 0
+        try:
+            finished = 0
+            while finished < workers:
+                item = await created.get()
+                if item is None:
+                    finished += 1
+                    continue
+                if item[2]:
+                    reused_count += 1
+                else:
+                    count += 1
+                yield item
+        finally:
+            # No-op after a full run; on cancellation or an early close every in-flight upload is
+            # cancelled together and awaited, so no task or pooled connection outlives the call
+            for task in tasks:
+                task.cancel()
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Per-product failures are handled in _create_one_logged; anything else is a bug, raise it
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                raise outcome
+        
+        logger.info(f"🎉 Successfully created {count} products on WHOP ({reused_count} already uploaded)")
+    
+    async def _create_one_logged(self, prompt: Dict, marketing_content: Dict) -> Tuple[Optional[str], bool]:
+        """(product_id, reused) with per-product failures logged; cancellation still propagates"""
+        try:
+            async with self._sem:
+                product_id, reused = await self._create_product(prompt, marketing_content)
+        except Exception as e:
+            logger.error(f"❌ Failed to create product {prompt.get('title')}: {str(e)}")
+            return None, False
+        if product_id and not reused:
+            logger.info("✅ Created product: %s (ID: %s)", prompt['title'], product_id)
+        return product_id, reused
     
     async def create_single_product(self, prompt: Dict, marketing_content: Dict) -> Optional[str]:
-        """Create single product on WHOP"""
+        """Create single product on WHOP; a product uploaded by an earlier run returns its existing id"""
+        # Build the payload only once an upload slot is free, so at most WHOP_CONCURRENCY bodies are held at once
+        async with self._sem:
+            product_id, _ = await self._create_product(prompt, marketing_content)
+        return product_id
+    
+    async def _create_product(self, prompt: Dict, marketing_content: Dict) -> Tuple[Optional[str], bool]:
+        """Build and POST one product, returning (product_id, reused); the caller holds the upload semaphore"""
         
         # Calculate price based on niche and quality
         price = self.config.get_pricing_strategy(prompt['niche'], prompt['quality_score'])
+        # Joined once; the description and the prompt file both list the keywords
+        keywords = ', '.join(prompt['keywords'])
         
         # Prepare product data
         product_data = {
+            **_BASE_PRODUCT,
             "name": prompt['title'],
-            "description": self.format_product_description(prompt, marketing_content),
+            "description": self.format_product_description(prompt, marketing_content, keywords),
             "price": price * 100,  # Price in cents
-            "type": "digital_product",
             "category": self.map_niche_to_category(prompt['niche']),
-            "tags": prompt['keywords'] + ["AI", "Prompts", "Automation"],
-            "files": await self.prepare_product_files(prompt),
-            "instant_delivery": True,
-            "unlimited_stock": True
+            "tags": [*prompt['keywords'], *_EXTRA_TAGS]
         }
+        # Metadata goes up as one JSON part, encoded once here and reused by every retry;
+        # file bodies travel as their own parts, unescaped
+        metadata = orjson.dumps(product_data)
+        
+        # The prompt body only travels in the file part, so it is part of the key; the file's
+        # per-batch created_at is not, or a re-run would never match
+        digest = hashlib.blake2b(metadata, digest_size=16)
+        digest.update(b"\0" + prompt['prompt'].encode() + b"\0" + str(prompt['template_type']).encode())
+        key = digest.hexdigest()
+        
+        if self._uploaded:
+            async with self._uploaded.execute(
+                _SQL_UPLOADED_GET, (key, int(time.time()) - self.config.WHOP_DEDUP_TTL)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row:
+                logger.info("♻️ Product already uploaded: %s (ID: %s)", prompt['title'], row[0])
+                return row[0], True
+        
+        files = _build_product_files(prompt, keywords)
         
-        if hasattr(self, 'mock_mode') and self.mock_mode:
+        if self._is_mock:
             # Mock mode for development
-            product_id = f"mock_{datetime.now().timestamp()}"
-            logger.info(f"🔧 Mock product created: {product_id}")
-            return product_id
+            product_id = f"{self._mock_prefix}_{next(self._mock_counter)}"
+            logger.info("🔧 Mock product created: %s", product_id)
+            return product_id, False
         
         try:
-            async with self.session.post(f"{self.base_url}/products", json=product_data) as response:
-                if response.status == 201:
-                    result = await response.json()
-                    return result.get('id')
-                else:
-                    error_text = await response.text()
-                    logger.error(f"❌ Product creation failed: {response.status} - {error_text}")
-                    return None
+            for attempt in range(self.config.MAX_RETRIES + 1):
+                await self._bucket.acquire()
+                async with self.session.post(f"{self.base_url}/products", data=_product_form(metadata, files), headers=self.headers) as response:
+                    self._bucket.update_from_headers(response.headers)
+                    if response.status == 201:
+                        result = orjson.loads(await response.read())
+                        product_id = result.get('id')
+                        if product_id and self._uploaded:
+                            await self._uploaded.execute(_SQL_UPLOADED_PUT, (key, product_id, int(time.time())))
+                        return product_id, False
                     
+                    if response.status in _RETRY_STATUSES and attempt < self.config.MAX_RETRIES:
+                        delay = _retry_after(response.headers, 2 ** attempt)
+                        logger.warning(f"⏳ Product creation got {response.status}, retrying in {delay:.1f}s")
+                    else:
+                        error_text = await response.text()
+                        logger.error(f"❌ Product creation failed: {response.status} - {error_text}")
+                        return None, False
+                await asyncio.sleep(delay)
+                
         except Exception as e:
             logger.error(f"❌ API request failed: {str(e)}")
-            return None
+            return None, False
     
-    def format_product_description(self, prompt: Dict, marketing_content: Dict) -> str:
+    def format_product_description(self, prompt: Dict, marketing_content: Dict, keywords: Optional[str] = None) -> str:
         """Format product description for WHOP"""
-        
-        description = f"""🤖 **Professional AI Prompt for {prompt['niche']}**
-
-{prompt['description']}
-
-**🎯 What You Get:**
-• High-quality AI prompt (150-300 words)
-• Detailed instructions and examples
-• Ready-to-use with ChatGPT, Claude, or any AI
-• Professional results in minutes
-• Keywords: {', '.join(prompt['keywords'])}
-
-**💡 Perfect For:**
-• {prompt['niche']} professionals
-• Content creators and marketers
-• Business owners and entrepreneurs
-• Anyone wanting to save time with AI
-
-**⚡ Instant Delivery:**
-Download immediately after purchase - no waiting!
-
-**🏆 Quality Guarantee:**
-Quality Score: {prompt['quality_score']:.1f}/1.0
-Created by Nosyt LLC - Professional AI Solutions
-
-**🔥 Limited Time:** Get this proven prompt template now!
-
----
-*Built by Nosyt LLC - Your AI Automation Experts*"""
-        
-        return description
+        if keywords is None:
+            keywords = ', '.join(prompt['keywords'])
+        head, after_description, after_keywords, tail = _description_parts(prompt['niche'])
+        return (
+            f"{head}{prompt['description']}{after_description}{keywords}"
+            f"{after_keywords}{prompt['quality_score']:.1f}{tail}"
+        )
     
     def map_niche_to_category(self, niche: str) -> str:
         """Map niche to WHOP category"""
-        category_mapping = {
-            "Business & Marketing": "business",
-            "Content Creation & Copywriting": "content",
-            "E-commerce & Sales": "ecommerce",
-            "Programming & Development": "development",
-            "Personal Productivity": "productivity",
-            "Social Media Marketing": "marketing",
-            "Email Marketing": "marketing",
-            "SEO & Digital Marketing": "marketing"
-        }
-        return category_mapping.get(niche, "tools")
+        return _CATEGORY_MAPPING.get(niche, "tools")
     
     async def prepare_product_files(self, prompt: Dict) -> List[Dict]:
         """Prepare downloadable files for the product"""
-        
-        # Create formatted prompt file
-        prompt_content = f"""# {prompt['title']}
-
-## AI Prompt:
-
-{prompt['prompt']}
-
-## Usage Instructions:
-
-1. Copy the prompt above
-2. Paste it into ChatGPT, Claude, or your preferred AI
-3. Replace any [PLACEHOLDER] text with your specific details
-4. Run the prompt and get professional results!
-
-## Keywords:
-{', '.join(prompt['keywords'])}
-
-## Template Type:
-{prompt['template_type']}
-
-## Created:
-{prompt['created_at']}
-
----
-Created by Nosyt LLC
-Professional AI Solutions
-"""
-        
-        # In a real implementation, you'd upload this to your file storage
-        # For now, we'll return the file structure
-        return [
-            {
-                "name": f"{prompt['title'].replace(' ', '_')}.txt",
-                "content": prompt_content,
-                "type": "text/plain"
-            }
-        ]
+        return _build_product_files(prompt)
     
     async def update_product_analytics(self, product_ids: List[str]):
         """Update product performance analytics"""
-        for product_id in product_ids:
-            try:
-                # Get product stats
-                stats = await self.get_product_stats(product_id)
-                # Update internal analytics
-                await self.store_product_analytics(product_id, stats)
-            except Exception as e:
-                logger.error(f"❌ Failed to update analytics for {product_id}: {str(e)}")
+        batched = await self.get_products_stats_batch(product_ids)
+        for product_id, stats in batched.items():
+            await self._store_logged(product_id, stats)
+        
+        # Anything the batch endpoint did not cover: fetch concurrently and store as results arrive
+        remaining = [product_id for product_id in product_ids if product_id not in batched]
+        for fetched in asyncio.as_completed([self._fetch_product_stats(product_id) for product_id in remaining]):
+            product_id, stats = await fetched
+            if stats is not None:
+                await self._store_logged(product_id, stats)
+    
+    async def _store_logged(self, product_id: str, stats: Dict):
+        """Store one product's stats, logging instead of raising on failure"""
+        try:
+            # Update internal analytics
+            await self.store_product_analytics(product_id, stats)
+        except Exception as e:
+            logger.error(f"❌ Failed to update analytics for {product_id}: {str(e)}")
+    
+    async def get_products_stats_batch(self, product_ids: List[str]) -> Dict[str, Dict]:
+        """Stats for many products in one request per _STATS_BATCH_SIZE ids; products missing from the result need a single fetch"""
+        if self._is_mock:
+            return {product_id: dict(_MOCK_STATS) for product_id in product_ids}
+        if not self._batch_stats_supported or not product_ids:
+            return {}
+        
+        chunks = await asyncio.gather(*(
+            self._fetch_stats_chunk(product_ids[i:i + _STATS_BATCH_SIZE])
+            for i in range(0, len(product_ids), _STATS_BATCH_SIZE)
+        ))
+        return {product_id: stats for chunk in chunks for product_id, stats in chunk.items()}
+    
+    async def _fetch_stats_chunk(self, product_ids: List[str]) -> Dict[str, Dict]:
+        """POST one chunk of ids to the batch stats endpoint"""
+        try:
+            async with self._sem:
+                await self._bucket.acquire()
+                async with self.session.post(f"{self.base_url}/products/stats:batch", data=orjson.dumps({"ids": product_ids}), headers=self._json_headers) as response:
+                    self._bucket.update_from_headers(response.headers)
+                    if response.status in (404, 405, 501):
+                        # Not offered by this API; use per-product fetches from now on
+                        self._batch_stats_supported = False
+                        return {}
+                    if response.status != 200:
+                        return {}
+                    result = orjson.loads(await response.read())
+        except Exception as e:
+            logger.error(f"❌ Batch stats request failed: {str(e)}")
+            return {}
+        
+        wanted = set(product_ids)
+        return {
+            product_id: stats for product_id, stats in result.items()
+            if product_id in wanted and isinstance(stats, dict)
+        }
+    
+    async def _fetch_product_stats(self, product_id: str) -> Tuple[str, Optional[Dict]]:
+        """Product stats under the shared semaphore and a timeout; None when the fetch failed"""
+        try:
+            async with self._sem:
+                return product_id, await asyncio.wait_for(self.get_product_stats(product_id), timeout=_STATS_TIMEOUT)
+        except Exception as e:
+            logger.error(f"❌ Failed to update analytics for {product_id}: {str(e) or type(e).__name__}")
+            return product_id, None
     
     async def get_product_stats(self, product_id: str) -> Dict:
         """Get product performance statistics"""
-        if hasattr(self, 'mock_mode') and self.mock_mode:
+        if self._is_mock:
             # Return mock data
-            return {
-                "views": 45,
-                "sales": 3,
-                "revenue": 135,
-                "conversion_rate": 0.067
-            }
+            return dict(_MOCK_STATS)
         
         try:
-            async with self.session.get(f"{self.base_url}/products/{product_id}/stats") as response:
+            await self._bucket.acquire()
+            async with self.session.get(f"{self.base_url}/products/{product_id}/stats", headers=self.headers) as response:
+                self._bucket.update_from_headers(response.headers)
                 if response.status == 200:
-                    return await response.json()
+                    return orjson.loads(await response.read())
                 else:
                     return {}
         except Exception as e:
@@ -233,9 +573,39 @@ Professional AI Solutions
     async def store_product_analytics(self, product_id: str, stats: Dict):
         """Store analytics data locally"""
         # Implementation would store in database
-        logger.info(f"📊 Analytics for {product_id}: {stats}")
+        # Per-product hot path: let logging format the stats dict only if INFO is enabled
+        logger.info("📊 Analytics for %s: %s", product_id, stats)
+    
+    async def _analytics_worker(self):
+        """Fetch and store stats for each product id queued by the uploaders until a None sentinel"""
+        while (product_id := await self._analytics_q.get()) is not None:
+            product_id, stats = await self._fetch_product_stats(product_id)
+            if stats is not None:
+                await self._store_logged(product_id, stats)
     
     async def close(self):
-        """Close API session"""
-        if self.session:
-            await self.session.close()
\ No newline at end of file
+        """Let queued analytics finish, then close API session unless it was supplied by the caller"""
+        if self._analytics_workers:
+            for _ in self._analytics_workers:
+                self._analytics_q.put_nowait(None)
+            await asyncio.gather(*self._analytics_workers, return_exceptions=True)
+            self._analytics_workers = []
+        await self._close_session()
+        if self._uploaded:
+            await self._uploaded.close()
+            self._uploaded = None
+    
+    async def _close_session(self):
+        """Close API session unless it was supplied by the caller"""
+        if self.session and self._owns_session:
+            await self.session.close()
+        self.session = None
+    
+    async def __aenter__(self):
+        """Initialize on entering an async with block"""
+        await self.initialize()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        """Close on leaving the block"""
+        await self.close()
\ No newline at end of file